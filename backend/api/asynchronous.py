@@ -0,0 +1,61 @@
+import asyncio
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from functools import partial, wraps
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+from rest_framework.permissions import SAFE_METHODS
+
+from .metrics import collect_sql
+
+executor = ThreadPoolExecutor(
+    max_workers=settings.ASYNC_ORM_WORKERS, thread_name_prefix='orm'
+)
+
+
+def run_view(view, request, *args, **kwargs):
+    close_old_connections()
+    metrics = getattr(request, 'metrics', None)
+    try:
+        with collect_sql(metrics) if metrics else nullcontext():
+            response = view(request, *args, **kwargs)
+            if callable(getattr(response, 'render', None)):
+                response.render()
+        return response
+    finally:
+        close_old_connections()
+
+
+def async_view(view):
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        if request.method not in SAFE_METHODS:
+            return await sync_to_async(run_view, thread_sensitive=True)(
+                view, request, *args, **kwargs
+            )
+        context = contextvars.copy_context()
+        return await asyncio.get_running_loop().run_in_executor(
+            executor,
+            context.run,
+            partial(run_view, view, request, *args, **kwargs),
+        )
+    return wrapper
+
+
+async def iterate_in_thread(iterable):
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    iterator = iter(iterable)
+    try:
+        while True:
+            part = await loop.run_in_executor(
+                executor, context.run, next, iterator, None
+            )
+            if part is None:
+                return
+            yield part
+    finally:
+        await loop.run_in_executor(executor, close_old_connections)
@@ -0,0 +1,41 @@
+from hashlib import sha256
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy as _
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+from rest_framework.exceptions import AuthenticationFailed
+
+TOKEN_KEY = 'token:{}'
+
+
+def get_token_cache_key(key):
+    return TOKEN_KEY.format(sha256(key.encode()).hexdigest())
+
+
+def forget_tokens(*keys):
+    cache.delete_many([get_token_cache_key(key) for key in keys])
+
+
+def forget_user_tokens(user):
+    forget_tokens(
+        *Token.objects.filter(user=user).values_list('key', flat=True)
+    )
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+
+    def authenticate_credentials(self, key):
+        cache_key = get_token_cache_key(key)
+        user_id = cache.get(cache_key)
+        if user_id is None:
+            user, token = super().authenticate_credentials(key)
+            cache.set(cache_key, user.pk, settings.TOKEN_CACHE_TIMEOUT)
+            return user, token
+        user = get_user_model().objects.filter(pk=user_id).first()
+        if user is None or not user.is_active:
+            cache.delete(cache_key)
+            raise AuthenticationFailed(_('User inactive or deleted.'))
+        return user, self.get_model()(key=key, user=user)
@@ -0,0 +1,32 @@
+import hashlib
+
+from django.conf import settings
+from drf_extra_fields.fields import Base64ImageField
+from rest_framework import serializers
+
+
+class HashedBase64ImageField(Base64ImageField):
+
+    def to_internal_value(self, base64_data):
+        if isinstance(base64_data, str):
+            encoded = base64_data.rsplit(';base64,', 1)[-1]
+            if len(encoded) * 3 // 4 > settings.RECIPE_IMAGE_MAX_SIZE:
+                raise serializers.ValidationError(
+                    f'Размер изображения не должен превышать '
+                    f'{settings.RECIPE_IMAGE_MAX_SIZE // (1024 * 1024)} МБ'
+                )
+        return super().to_internal_value(base64_data)
+
+    def get_file_name(self, decoded_file):
+        return hashlib.sha256(decoded_file).hexdigest()
+
+
+class RenditionImageField(serializers.ImageField):
+
+    def __init__(self, rendition, **kwargs):
+        self.rendition = rendition
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+
+    def get_attribute(self, instance):
+        return getattr(instance, self.rendition) or instance.image
@@ -1,6 +1,14 @@
+from django.db.models import Exists, OuterRef
 from django_filters import rest_framework as filters
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend, OrderingFilter
 
-from recipes.models import Ingredient, Recipe
+from recipes.models import Cart, Favorite, Ingredient, Recipe, Tag
+from recipes.search import search_recipes
+
+SEARCH_WITH_CURSOR = (
+    'Поиск по релевантности нельзя листать курсором, используйте page'
+)
 
 
 class IngredientFilter(filters.FilterSet):
@@ -23,14 +31,69 @@ class RecipeFilter(filters.FilterSet):
         field_name='is_in_shopping_cart',
         method='shopping_cart_filter'
     )
-    tags = filters.AllValuesMultipleFilter(field_name='tags__slug')
+    tags = filters.ModelMultipleChoiceFilter(
+        field_name='tags',
+        to_field_name='slug',
+        queryset=Tag.objects.all(),
+        method='tags_filter'
+    )
+
+    def user_filter(self, queryset, model, value):
+        user = self.request.user
+        if user.is_anonymous:
+            return queryset.none() if value else queryset
+        exists = Exists(
+            model.objects.filter(user=user, recipe=OuterRef('pk'))
+        )
+        return queryset.filter(exists if value else ~exists)
 
     def favorite_filter(self, queryset, name, value):
-        return Recipe.objects.filter(favorite__user=self.request.user)
+        return self.user_filter(queryset, Favorite, value)
 
     def shopping_cart_filter(self, queryset, name, value):
-        return Recipe.objects.filter(shopping_cart__user=self.request.user)
+        return self.user_filter(queryset, Cart, value)
+
+    def tags_filter(self, queryset, name, value):
+        if not value:
+            return queryset
+        return queryset.filter(
+            Exists(
+                Recipe.tags.through.objects.filter(
+                    recipe=OuterRef('pk'), tag__in=value
+                )
+            )
+        )
 
     class Meta:
         model = Recipe
         fields = ['author']
+
+
+class RecipeSearchFilter(BaseFilterBackend):
+    search_param = 'search'
+    cursor_param = 'cursor'
+
+    def filter_queryset(self, request, queryset, view):
+        query = request.query_params.get(self.search_param, '').strip()
+        if not query:
+            return queryset
+        if (
+            view.action == 'list'
+            and self.cursor_param in request.query_params
+        ):
+            raise ValidationError({self.search_param: SEARCH_WITH_CURSOR})
+        return search_recipes(queryset, query)
+
+
+class RecipeOrderingFilter(OrderingFilter):
+
+    def get_ordering(self, request, queryset, view):
+        ordering = tuple(super().get_ordering(request, queryset, view))
+        if '-id' in ordering:
+            return ordering
+        return (*ordering, '-id')
+
+    def filter_queryset(self, request, queryset, view):
+        if self.ordering_param not in request.query_params:
+            return queryset
+        return super().filter_queryset(request, queryset, view)
@@ -0,0 +1,72 @@
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import connection, transaction
+from PIL import Image, features
+
+from recipes.models import Recipe
+
+logger = logging.getLogger(__name__)
+
+RENDITIONS = {
+    'image_thumbnail': ('thumbnail', (320, 320)),
+    'image_card': ('card', (960, 960)),
+}
+RENDITION_FORMAT, RENDITION_EXTENSION = (
+    ('WEBP', 'webp') if features.check('webp') else ('JPEG', 'jpg')
+)
+RENDITION_QUALITY = 80
+
+executor = ThreadPoolExecutor(
+    max_workers=settings.IMAGE_WORKERS,
+    thread_name_prefix='renditions',
+)
+
+
+def make_rendition(image, size):
+    with Image.open(image) as picture:
+        picture.thumbnail(size)
+        mode = 'RGBA' if RENDITION_FORMAT == 'WEBP' else 'RGB'
+        if picture.mode != mode:
+            picture = picture.convert(mode)
+        content = BytesIO()
+        picture.save(content, RENDITION_FORMAT, quality=RENDITION_QUALITY)
+    return ContentFile(content.getvalue())
+
+
+def make_renditions(recipe_id):
+    recipe = Recipe.objects.filter(pk=recipe_id).only('image').first()
+    if recipe is None or not recipe.image:
+        return
+    stem = os.path.splitext(os.path.basename(recipe.image.name))[0]
+    renditions = {}
+    for field_name, (suffix, size) in RENDITIONS.items():
+        field = Recipe._meta.get_field(field_name)
+        name = field.generate_filename(
+            recipe, f'{stem}_{suffix}.{RENDITION_EXTENSION}'
+        )
+        if not field.storage.exists(name):
+            with recipe.image.open('rb') as image:
+                name = field.storage.save(name, make_rendition(image, size))
+        renditions[field_name] = name
+    Recipe.objects.filter(
+        pk=recipe_id, image=recipe.image.name
+    ).update(**renditions)
+
+
+def run_renditions(recipe_id):
+    try:
+        make_renditions(recipe_id)
+    except Exception:
+        logger.exception('Не удалось подготовить изображения рецепта %s',
+                         recipe_id)
+    finally:
+        connection.close()
+
+
+def schedule_renditions(recipe):
+    transaction.on_commit(lambda: executor.submit(run_renditions, recipe.pk))
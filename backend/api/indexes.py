@@ -0,0 +1,66 @@
+import time
+from bisect import bisect_left
+from threading import Lock
+
+from django.conf import settings
+
+from recipes.models import Ingredient
+
+from .routers import read_primary
+from .versions import INGREDIENTS, get_version
+
+MAX_CHAR = chr(0x10ffff)
+
+
+class IngredientIndex:
+
+    def __init__(self):
+        self.version = None
+        self.checked = 0
+        self.index = ([], [])
+        self.lock = Lock()
+
+    def refresh(self):
+        now = time.monotonic()
+        if now < self.checked + settings.INGREDIENT_INDEX_TTL:
+            return
+        version = get_version(INGREDIENTS)
+        self.checked = now
+        if version == self.version:
+            return
+        with self.lock:
+            if version == self.version:
+                return
+            with read_primary():
+                ingredients = list(Ingredient.objects.values_list(
+                    'id', 'name', 'measurement_unit'
+                ))
+            rows = sorted(
+                (name.casefold(), pk, name, measurement_unit)
+                for pk, name, measurement_unit in ingredients
+            )
+            self.index = (
+                [row[0] for row in rows],
+                [
+                    Ingredient(
+                        id=pk, name=name, measurement_unit=measurement_unit
+                    )
+                    for _, pk, name, measurement_unit in rows
+                ],
+            )
+            self.version = version
+
+    def search(self, query):
+        self.refresh()
+        keys, ingredients = self.index
+        query = query.casefold()
+        start = bisect_left(keys, query)
+        end = bisect_left(keys, query + MAX_CHAR, start)
+        return ingredients[start:end] + [
+            ingredient
+            for key, ingredient in zip(keys, ingredients)
+            if query in key and not key.startswith(query)
+        ]
+
+
+ingredient_index = IngredientIndex()
@@ -0,0 +1,320 @@
+import json
+import time
+from functools import partial
+
+from django.core.cache import cache
+from django.core.management import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Count
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from rest_framework.authtoken.models import Token
+
+from recipes.models import Ingredient, Recipe, Tag
+from users.models import User
+
+PERCENTILES = (50, 95, 99)
+WRITE_BATCH = 10
+IMAGE = (
+    'data:image/gif;base64,'
+    'R0lGODlhAQABAIAAAP///wAAACH5BAEAAAAALAAAAAABAAEAAAICRAEAOw=='
+)
+
+
+def percentile(values, percent):
+    ordered = sorted(values)
+    index = max(round(percent / 100 * len(ordered)) - 1, 0)
+    return ordered[index]
+
+
+class Command(BaseCommand):
+    help = 'Benchmarks API endpoints'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=50)
+        parser.add_argument('--warmup', type=int, default=3)
+        parser.add_argument(
+            '--user',
+            help='Пользователь, от имени которого выполняются запросы',
+        )
+        parser.add_argument(
+            '--cold', action='store_true',
+            help='Очищать кэш перед каждым запросом',
+        )
+        parser.add_argument(
+            '--only', nargs='+', default=(),
+            help='Запустить только перечисленные сценарии',
+        )
+        parser.add_argument(
+            '--output', help='Сохранить результаты в JSON-файл',
+        )
+        parser.add_argument(
+            '--baseline', help='Сравнить результаты с JSON-файлом',
+        )
+        parser.add_argument(
+            '--threshold', type=float, default=0.2,
+            help='Допустимый относительный рост p95',
+        )
+
+    def get_user(self, username):
+        if username:
+            user = User.objects.filter(username=username).first()
+        else:
+            user = User.objects.annotate(
+                cart_count=Count('shopping_cart')
+            ).order_by('-cart_count', 'pk').first()
+        if user is None:
+            raise CommandError(
+                'Пользователь не найден, сначала выполните generate_data'
+            )
+        return user
+
+    def get_scenarios(self, user):
+        recipes = Recipe.objects.order_by('-pub_date', '-id')
+        recipe = recipes.first()
+        if recipe is None:
+            raise CommandError(
+                'Рецепты не найдены, сначала выполните generate_data'
+            )
+        combined = recipes.filter(
+            favorite__user=user, shopping_cart__user=user
+        ).first() or recipe
+        author = User.objects.annotate(
+            recipes_count=Count('recipes')
+        ).order_by('-recipes_count', 'pk').values_list('pk', flat=True)[0]
+        tags = list(Tag.objects.values_list('slug', flat=True)[:2])
+        ingredient = Ingredient.objects.values_list(
+            'name', flat=True
+        ).first() or ''
+        cart = '/api/recipes/download_shopping_cart/'
+        return (
+            ('recipes', '/api/recipes/', {}),
+            ('recipes-tags', '/api/recipes/', {'tags': tags}),
+            ('recipes-author', '/api/recipes/', {'author': author}),
+            ('recipes-favorited', '/api/recipes/', {'is_favorited': 1}),
+            ('recipes-cart', '/api/recipes/', {'is_in_shopping_cart': 1}),
+            ('recipes-combined', '/api/recipes/', {
+                'tags': list(combined.tags.values_list('slug', flat=True)),
+                'author': combined.author_id,
+                'is_favorited': 1,
+                'is_in_shopping_cart': 1,
+            }),
+            ('recipes-popular', '/api/recipes/',
+             {'ordering': '-favorites_count'}),
+            ('recipes-search', '/api/recipes/',
+             {'search': recipe.name.split()[0]}),
+            ('recipes-cursor', '/api/recipes/', {'cursor': ''}),
+            ('feed', '/api/recipes/feed/', {}),
+            ('recipe-detail', f'/api/recipes/{recipe.pk}/', {}),
+            ('tags', '/api/tags/', {}),
+            ('ingredients', '/api/ingredients/', {}),
+            ('ingredients-search', '/api/ingredients/',
+             {'name': ingredient[:3]}),
+            ('users', '/api/users/', {}),
+            ('users-me', '/api/users/me/', {}),
+            ('user-detail', f'/api/users/{author}/', {}),
+            ('subscriptions', '/api/users/subscriptions/',
+             {'recipes_limit': 3}),
+            ('cart-txt', cart, {'format': 'txt'}),
+            ('cart-csv', cart, {'format': 'csv'}),
+            ('cart-pdf', cart, {'format': 'pdf'}),
+        )
+
+    def get_write_scenarios(self, user):
+        recipes = Recipe.objects.exclude(
+            favorite__user=user
+        ).exclude(
+            shopping_cart__user=user
+        ).order_by('-pub_date', '-id')
+        recipe_ids = list(recipes.values_list('pk', flat=True)[:WRITE_BATCH])
+        author = User.objects.exclude(pk=user.pk).exclude(
+            following__user=user
+        ).order_by('pk').first()
+        own = Recipe.objects.filter(author=user).order_by('-pk').first()
+        if not recipe_ids or author is None or own is None:
+            raise CommandError(
+                'Недостаточно данных для сценариев записи, '
+                'сначала выполните generate_data'
+            )
+        recipe = f'/api/recipes/{recipe_ids[0]}/'
+        subscribe = f'/api/users/{author.pk}/subscribe/'
+        batch = {'recipes': recipe_ids}
+        data = {
+            'tags': list(Tag.objects.values_list('pk', flat=True)[:2]),
+            'ingredients': [
+                {'id': ingredient, 'amount': amount}
+                for amount, ingredient in enumerate(
+                    Ingredient.objects.values_list('pk', flat=True)[:5],
+                    start=1,
+                )
+            ],
+            'name': 'Рецепт для замера',
+            'text': 'Описание рецепта для замера',
+            'cooking_time': 15,
+        }
+        return (
+            ('subscribe', 'POST', subscribe, None, 201, ()),
+            ('unsubscribe', 'DELETE', subscribe, None, 204,
+             (('POST', subscribe, None),)),
+            ('favorite-add', 'POST', f'{recipe}favorite/', None, 201, ()),
+            ('favorite-remove', 'DELETE', f'{recipe}favorite/', None, 204,
+             (('POST', f'{recipe}favorite/', None),)),
+            ('favorite-batch-add', 'POST', '/api/recipes/favorite/', batch,
+             200, ()),
+            ('favorite-batch-del', 'DELETE', '/api/recipes/favorite/', batch,
+             200, (('POST', '/api/recipes/favorite/', batch),)),
+            ('cart-add', 'POST', f'{recipe}shopping_cart/', None, 201, ()),
+            ('cart-remove', 'DELETE', f'{recipe}shopping_cart/', None, 204,
+             (('POST', f'{recipe}shopping_cart/', None),)),
+            ('cart-batch-add', 'POST', '/api/recipes/shopping_cart/', batch,
+             200, ()),
+            ('cart-batch-remove', 'DELETE', '/api/recipes/shopping_cart/',
+             batch, 200, (('POST', '/api/recipes/shopping_cart/', batch),)),
+            ('cart-clear', 'DELETE', '/api/recipes/shopping_cart/clear/',
+             None, 200, ()),
+            ('recipe-create', 'POST', '/api/recipes/',
+             {**data, 'image': IMAGE}, 201, ()),
+            ('recipe-update', 'PATCH', f'/api/recipes/{own.pk}/', data, 200,
+             ()),
+            ('recipe-delete', 'DELETE', f'/api/recipes/{own.pk}/', None, 204,
+             ()),
+        )
+
+    def request(self, client, path, params):
+        response = client.get(path, params)
+        if response.status_code != 200:
+            raise CommandError(
+                f'{path} {params}: статус {response.status_code}'
+            )
+        if response.streaming:
+            b''.join(response.streaming_content)
+        else:
+            response.content
+        return response
+
+    def run_scenario(self, client, path, params, iterations, warmup, cold):
+        for _ in range(warmup):
+            self.request(client, path, params)
+        timings = []
+        queries = 0
+        for _ in range(iterations):
+            if cold:
+                cache.clear()
+            with CaptureQueriesContext(connection) as context:
+                started = time.perf_counter()
+                self.request(client, path, params)
+                timings.append((time.perf_counter() - started) * 1000)
+            queries = max(queries, len(context.captured_queries))
+        return self.summarize(timings, queries)
+
+    def write(self, client, method, path, data, status=None):
+        response = client.generic(
+            method, path, json.dumps(data) if data is not None else '',
+            content_type='application/json',
+        )
+        if status is not None and response.status_code != status:
+            raise CommandError(
+                f'{method} {path}: статус {response.status_code}'
+            )
+        return response
+
+    def run_write_scenario(self, client, scenario, iterations, warmup):
+        method, path, data, status, prepare = scenario
+        timings = []
+        queries = 0
+        for iteration in range(warmup + iterations):
+            with transaction.atomic():
+                for step in prepare:
+                    self.write(client, *step)
+                with CaptureQueriesContext(connection) as context:
+                    started = time.perf_counter()
+                    self.write(client, method, path, data, status)
+                    elapsed = (time.perf_counter() - started) * 1000
+                transaction.set_rollback(True)
+            if iteration >= warmup:
+                timings.append(elapsed)
+                queries = max(queries, len(context.captured_queries))
+        return self.summarize(timings, queries)
+
+    def summarize(self, timings, queries):
+        result = {
+            f'p{percent}': round(percentile(timings, percent), 2)
+            for percent in PERCENTILES
+        }
+        result['queries'] = queries
+        return result
+
+    def compare(self, results, baseline, threshold):
+        regressions = []
+        for name, result in results.items():
+            expected = baseline.get(name)
+            if expected is None:
+                continue
+            if result['queries'] > expected['queries']:
+                regressions.append(
+                    f'{name}: запросов к БД {result["queries"]} '
+                    f'вместо {expected["queries"]}'
+                )
+            if result['p95'] > expected['p95'] * (1 + threshold):
+                regressions.append(
+                    f'{name}: p95 {result["p95"]} мс '
+                    f'вместо {expected["p95"]} мс'
+                )
+        return regressions
+
+    def handle(self, *args, **options):
+        if options['iterations'] < 1:
+            raise CommandError('--iterations должно быть больше 0')
+        baseline = None
+        if options['baseline']:
+            with open(options['baseline'], encoding='utf-8') as file:
+                baseline = json.load(file)
+        user = self.get_user(options['user'])
+        token, _ = Token.objects.get_or_create(user=user)
+        client = Client(HTTP_AUTHORIZATION=f'Token {token.key}')
+        iterations, warmup = options['iterations'], options['warmup']
+        scenarios = [
+            (name, partial(
+                self.run_scenario, client, path, params,
+                iterations, warmup, options['cold'],
+            ))
+            for name, path, params in self.get_scenarios(user)
+        ]
+        only = set(options['only'])
+        if not only or only - {name for name, _ in scenarios}:
+            scenarios.extend(
+                (name, partial(
+                    self.run_write_scenario, client, scenario,
+                    iterations, warmup,
+                ))
+                for name, *scenario in self.get_write_scenarios(user)
+            )
+        if only:
+            scenarios = [
+                scenario for scenario in scenarios if scenario[0] in only
+            ]
+        self.stdout.write(
+            f'{"сценарий":<20}{"p50":>10}{"p95":>10}{"p99":>10}'
+            f'{"запросы":>10}'
+        )
+        results = {}
+        for name, run in scenarios:
+            result = run()
+            results[name] = result
+            self.stdout.write(
+                f'{name:<20}{result["p50"]:>10}{result["p95"]:>10}'
+                f'{result["p99"]:>10}{result["queries"]:>10}'
+            )
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                json.dump(results, file, ensure_ascii=False, indent=2)
+        if baseline is None:
+            return
+        regressions = self.compare(
+            results, baseline, options['threshold']
+        )
+        if regressions:
+            raise CommandError(
+                'Обнаружена деградация:\n' + '\n'.join(regressions)
+            )
+        self.stdout.write(self.style.SUCCESS('Деградаций не обнаружено'))
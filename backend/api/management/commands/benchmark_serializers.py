@@ -0,0 +1,165 @@
+import time
+from itertools import count
+
+from django.core.management import CommandError
+from django.db import connection
+from django.test import Client, RequestFactory
+from django.test.utils import CaptureQueriesContext, override_settings
+from rest_framework.authtoken.models import Token
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+
+from .benchmark import PERCENTILES, Command as BenchmarkCommand, percentile
+from api.renderers import FastJSONRenderer
+from api.views import RecipeViewSet
+from recipes.models import Recipe
+
+PATHS = (
+    ('serializer', False, JSONRenderer),
+    ('fast', True, FastJSONRenderer),
+)
+
+
+class Command(BenchmarkCommand):
+    help = 'Checks fast recipe serializer parity and benchmarks it'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user',
+            help='Пользователь, от имени которого выполняются запросы',
+        )
+        parser.add_argument(
+            '--recipes', type=int, default=100,
+            help='Количество рецептов в одном ответе',
+        )
+        parser.add_argument('--iterations', type=int, default=20)
+
+    def fresh_cache(self):
+        return override_settings(CACHES={
+            'default': {
+                'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+                'LOCATION': f'serializers-{next(self.caches)}',
+            }
+        })
+
+    def fetch(self, client, path, params, fast):
+        with override_settings(RECIPE_FAST_PATH=fast), self.fresh_cache():
+            response = client.get(path, params)
+        return response.status_code, response.content
+
+    def check_parity(self, user):
+        token, _ = Token.objects.get_or_create(user=user)
+        clients = (
+            ('токен', Client(HTTP_AUTHORIZATION=f'Token {token.key}')),
+            ('аноним', Client()),
+        )
+        mismatches = []
+        checked = 0
+        for name, path, params in self.get_scenarios(user):
+            if not path.startswith('/api/recipes/') or 'cart' in path:
+                continue
+            for label, client in clients:
+                expected = self.fetch(client, path, params, False)
+                actual = self.fetch(client, path, params, True)
+                checked += 1
+                if actual == expected:
+                    continue
+                position = next(
+                    (
+                        index for index, (left, right) in enumerate(
+                            zip(expected[1], actual[1])
+                        ) if left != right
+                    ),
+                    min(len(expected[1]), len(actual[1])),
+                )
+                mismatches.append(
+                    f'{name} ({label}): статус {expected[0]}/{actual[0]}, '
+                    f'расхождение с байта {position}: '
+                    f'{expected[1][position:position + 80]!r} != '
+                    f'{actual[1][position:position + 80]!r}'
+                )
+        if mismatches:
+            raise CommandError(
+                'Ответы быстрого сериализатора отличаются:\n'
+                + '\n'.join(mismatches)
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f'Ответы совпадают побайтово: {checked}'
+        ))
+
+    def serialize(self, user, recipe_ids, fast, renderer):
+        request = Request(RequestFactory().get('/api/recipes/'))
+        request.user = user
+        view = RecipeViewSet(
+            action='list', request=request, format_kwarg=None, kwargs={},
+        )
+        with override_settings(RECIPE_FAST_PATH=fast):
+            queryset = view.get_queryset().filter(
+                pk__in=recipe_ids
+            ).order_by('-pub_date', '-id')
+            serializer_class = view.get_serializer_class()
+        with CaptureQueriesContext(connection) as context:
+            started = time.perf_counter()
+            data = serializer_class(
+                list(queryset), many=True, context={'request': request}
+            ).data
+            built = time.perf_counter()
+            body = renderer().render(data)
+            rendered = time.perf_counter()
+        return (
+            built - started, rendered - built, len(context.captured_queries),
+            body,
+        )
+
+    def benchmark(self, user, recipes, iterations):
+        recipe_ids = list(
+            Recipe.objects.order_by('-pub_date', '-id').values_list(
+                'pk', flat=True
+            )[:recipes]
+        )
+        if not recipe_ids:
+            raise CommandError(
+                'Рецепты не найдены, сначала выполните generate_data'
+            )
+        per_recipe = 1000000 / len(recipe_ids)
+        self.stdout.write(
+            f'рецептов в ответе: {len(recipe_ids)}, время на рецепт в мкс'
+        )
+        self.stdout.write(
+            f'{"путь":<12}{"сборка p50":>12}{"рендер p50":>12}'
+            + ''.join(f'{f"итого p{percent}":>12}' for percent in PERCENTILES)
+            + f'{"запросы":>10}'
+        )
+        bodies = {}
+        for name, fast, renderer in PATHS:
+            self.serialize(user, recipe_ids, fast, renderer)
+            build, render, totals = [], [], []
+            for _ in range(iterations):
+                build_time, render_time, queries, body = self.serialize(
+                    user, recipe_ids, fast, renderer
+                )
+                build.append(build_time * per_recipe)
+                render.append(render_time * per_recipe)
+                totals.append((build_time + render_time) * per_recipe)
+            bodies[name] = body
+            self.stdout.write(
+                f'{name:<12}{percentile(build, 50):>12.1f}'
+                f'{percentile(render, 50):>12.1f}'
+                + ''.join(
+                    f'{percentile(totals, percent):>12.1f}'
+                    for percent in PERCENTILES
+                )
+                + f'{queries:>10}'
+            )
+        if len(set(bodies.values())) != 1:
+            raise CommandError('Сериализованные рецепты отличаются')
+
+    def handle(self, *args, **options):
+        for option in ('recipes', 'iterations'):
+            if options[option] < 1:
+                raise CommandError(f'--{option} должно быть больше 0')
+        self.caches = count()
+        user = self.get_user(options['user'])
+        self.check_parity(user)
+        with self.fresh_cache():
+            self.benchmark(user, options['recipes'], options['iterations'])
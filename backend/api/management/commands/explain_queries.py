@@ -0,0 +1,174 @@
+import json
+import re
+
+from django.core.management import CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from rest_framework.authtoken.models import Token
+
+from .benchmark import Command as BenchmarkCommand
+
+SCAN_NODES = ('Seq Scan', 'Parallel Seq Scan')
+SORT_NODES = ('Sort',)
+SQLITE_SCAN = re.compile(
+    r'^SCAN (?:TABLE )?(\w+)\b(?! USING (?:COVERING )?INDEX| VIRTUAL TABLE)'
+)
+
+
+def walk_plan(plan):
+    yield plan
+    for child in plan.get('Plans', ()):
+        yield from walk_plan(child)
+
+
+class Command(BenchmarkCommand):
+    help = 'Explains SQL queries behind API endpoints and flags slow plans'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user',
+            help='Пользователь, от имени которого выполняются запросы',
+        )
+        parser.add_argument(
+            '--only', nargs='+', default=(),
+            help='Проверить только перечисленные сценарии',
+        )
+        parser.add_argument(
+            '--rows', type=int, default=1000,
+            help='Порог строк для последовательного чтения и сортировки',
+        )
+        parser.add_argument(
+            '--verbose-plans', action='store_true',
+            help='Выводить полный план каждого запроса',
+        )
+        parser.add_argument(
+            '--strict', action='store_true',
+            help='Завершаться с ошибкой при найденных проблемах',
+        )
+
+    def capture(self, client, name, path, params):
+        caches = {
+            'default': {
+                'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+                'LOCATION': f'explain-{name}',
+            }
+        }
+        with override_settings(CACHES=caches):
+            with CaptureQueriesContext(connection) as context:
+                self.request(client, path, params)
+        return [
+            query['sql'] for query in context.captured_queries
+            if query['sql'].lstrip().upper().startswith('SELECT')
+        ]
+
+    def explain_postgresql(self, cursor, sql, rows):
+        cursor.execute(
+            f'EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {sql}'
+        )
+        result = cursor.fetchone()[0]
+        if isinstance(result, str):
+            result = json.loads(result)
+        plan = result[0]['Plan']
+        issues = []
+        for node in walk_plan(plan):
+            loops = node.get('Actual Loops', 1)
+            if node['Node Type'] in SCAN_NODES:
+                scanned = (
+                    node['Actual Rows'] + node.get('Rows Removed by Filter', 0)
+                ) * loops
+                if scanned >= rows:
+                    issues.append(
+                        f'{node["Node Type"]} по {node["Relation Name"]}: '
+                        f'{scanned} строк'
+                    )
+            elif node['Node Type'] in SORT_NODES:
+                sorted_rows = node['Actual Rows'] * loops
+                if sorted_rows >= rows:
+                    issues.append(
+                        f'Sort ({node.get("Sort Method", "?")}) по '
+                        f'{", ".join(node.get("Sort Key", ()))}: '
+                        f'{sorted_rows} строк'
+                    )
+        summary = (
+            f'{result[0]["Execution Time"]:.2f} мс, буферов: '
+            f'{plan.get("Shared Hit Blocks", 0)} в кэше, '
+            f'{plan.get("Shared Read Blocks", 0)} с диска'
+        )
+        text = None
+        if self.verbose_plans:
+            cursor.execute(f'EXPLAIN (ANALYZE, BUFFERS) {sql}')
+            text = '\n'.join(line for line, in cursor.fetchall())
+        return issues, summary, text
+
+    def explain_sqlite(self, cursor, sql, rows):
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+        details = [row[3] for row in cursor.fetchall()]
+        issues = []
+        for detail in details:
+            match = SQLITE_SCAN.match(detail)
+            if not match or match.group(1) not in self.tables:
+                continue
+            table = match.group(1)
+            if table not in self.table_sizes:
+                cursor.execute(
+                    f'SELECT COUNT(*) FROM {connection.ops.quote_name(table)}'
+                )
+                self.table_sizes[table] = cursor.fetchone()[0]
+            if self.table_sizes[table] >= rows:
+                issues.append(f'{detail}: {self.table_sizes[table]} строк')
+        text = '\n'.join(details) if self.verbose_plans else None
+        return issues, None, text
+
+    def report(self, sql, issues, summary, text):
+        if not issues and not text:
+            return
+        self.stdout.write(f'  {sql[:200]}')
+        if summary:
+            self.stdout.write(f'    {summary}')
+        for issue in issues:
+            self.stdout.write(self.style.WARNING(f'    {issue}'))
+        for line in (text or '').splitlines():
+            self.stdout.write(f'      {line}')
+
+    def handle(self, *args, **options):
+        explain = {
+            'postgresql': self.explain_postgresql,
+            'sqlite': self.explain_sqlite,
+        }.get(connection.vendor)
+        if explain is None:
+            raise CommandError(
+                f'СУБД {connection.vendor} не поддерживается'
+            )
+        self.verbose_plans = options['verbose_plans']
+        self.table_sizes = {}
+        self.tables = set(connection.introspection.table_names())
+        user = self.get_user(options['user'])
+        token, _ = Token.objects.get_or_create(user=user)
+        client = Client(HTTP_AUTHORIZATION=f'Token {token.key}')
+        scenarios = self.get_scenarios(user)
+        if options['only']:
+            scenarios = [
+                scenario for scenario in scenarios
+                if scenario[0] in options['only']
+            ]
+        problems = 0
+        for name, path, params in scenarios:
+            queries = self.capture(client, name, path, params)
+            self.stdout.write(
+                self.style.MIGRATE_HEADING(f'{name}: запросов {len(queries)}')
+            )
+            for sql in queries:
+                with connection.cursor() as cursor:
+                    issues, summary, text = explain(
+                        cursor, sql, options['rows']
+                    )
+                self.report(sql, issues, summary, text)
+                problems += len(issues)
+        if not problems:
+            self.stdout.write(self.style.SUCCESS('Проблемных планов нет'))
+            return
+        message = f'Найдено проблем в планах запросов: {problems}'
+        if options['strict']:
+            raise CommandError(message)
+        self.stdout.write(self.style.WARNING(message))
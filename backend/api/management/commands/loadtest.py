@@ -0,0 +1,144 @@
+import json
+import threading
+import time
+from collections import defaultdict
+from urllib.error import HTTPError, URLError
+from urllib.parse import quote
+from urllib.request import Request, urlopen
+
+from django.core.management import BaseCommand, CommandError
+
+from .benchmark import PERCENTILES, percentile
+
+ANONYMOUS_PATHS = (
+    '/api/recipes/',
+    '/api/recipes/?tags=breakfast&tags=lunch',
+    '/api/tags/',
+    '/api/ingredients/?name=ингр',
+)
+AUTHENTICATED_PATHS = (
+    '/api/recipes/?is_favorited=1',
+    '/api/users/subscriptions/?recipes_limit=3',
+    '/api/recipes/download_shopping_cart/?format=pdf',
+)
+
+
+class Command(BaseCommand):
+    help = 'Load-tests a running server over HTTP'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default='http://127.0.0.1:8000')
+        parser.add_argument(
+            '--token', help='Токен для авторизованных запросов',
+        )
+        parser.add_argument(
+            '--paths', nargs='+',
+            help='Пути для нагрузки вместо набора по умолчанию',
+        )
+        parser.add_argument('--concurrency', type=int, default=32)
+        parser.add_argument(
+            '--duration', type=float, default=30,
+            help='Длительность нагрузки в секундах',
+        )
+        parser.add_argument('--timeout', type=float, default=30)
+        parser.add_argument(
+            '--output', help='Сохранить результаты в JSON-файл',
+        )
+        parser.add_argument(
+            '--compare', help='Сравнить результаты с JSON-файлом',
+        )
+
+    def get_paths(self, options):
+        if options['paths']:
+            return options['paths']
+        if options['token']:
+            return ANONYMOUS_PATHS + AUTHENTICATED_PATHS
+        return ANONYMOUS_PATHS
+
+    def worker(self, offset, paths, deadline, options, samples, lock):
+        headers = {}
+        if options['token']:
+            headers['Authorization'] = f'Token {options["token"]}'
+        index = offset
+        while time.monotonic() < deadline:
+            path = paths[index % len(paths)]
+            index += 1
+            request = Request(
+                options['url'] + quote(path, safe='/?&='), headers=headers
+            )
+            started = time.perf_counter()
+            try:
+                with urlopen(request, timeout=options['timeout']) as response:
+                    response.read()
+                    status = response.status
+            except HTTPError as error:
+                status = error.code
+            except (URLError, OSError):
+                status = None
+            elapsed = (time.perf_counter() - started) * 1000
+            with lock:
+                samples[path].append((elapsed, status))
+
+    def summarize(self, samples, duration):
+        results = {}
+        for path, path_samples in [('total', sum(samples.values(), []))] + (
+            sorted(samples.items())
+        ):
+            timings = [elapsed for elapsed, _ in path_samples]
+            if not timings:
+                continue
+            result = {
+                f'p{value}': round(percentile(timings, value), 2)
+                for value in PERCENTILES
+            }
+            result['rps'] = round(len(timings) / duration, 1)
+            result['errors'] = sum(
+                status != 200 for _, status in path_samples
+            )
+            results[path] = result
+        return results
+
+    def handle(self, *args, **options):
+        if options['concurrency'] < 1:
+            raise CommandError('--concurrency должно быть больше 0')
+        paths = self.get_paths(options)
+        samples = defaultdict(list)
+        lock = threading.Lock()
+        started = time.monotonic()
+        deadline = started + options['duration']
+        threads = [
+            threading.Thread(
+                target=self.worker,
+                args=(offset, paths, deadline, options, samples, lock),
+            )
+            for offset in range(options['concurrency'])
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        results = self.summarize(samples, time.monotonic() - started)
+        baseline = {}
+        if options['compare']:
+            with open(options['compare'], encoding='utf-8') as file:
+                baseline = json.load(file)
+        self.stdout.write(
+            f'{"путь":<50}{"rps":>10}{"p50":>10}{"p95":>10}{"p99":>10}'
+            f'{"ошибки":>10}'
+        )
+        for path, result in results.items():
+            line = (
+                f'{path:<50}{result["rps"]:>10}{result["p50"]:>10}'
+                f'{result["p95"]:>10}{result["p99"]:>10}'
+                f'{result["errors"]:>10}'
+            )
+            expected = baseline.get(path)
+            if expected and expected['rps'] and expected['p99']:
+                line += (
+                    f'  rps {result["rps"] / expected["rps"] - 1:+.0%}, '
+                    f'p99 {result["p99"] / expected["p99"] - 1:+.0%}'
+                )
+            self.stdout.write(line)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                json.dump(results, file, ensure_ascii=False, indent=2)
@@ -0,0 +1,55 @@
+from django.core.cache import cache
+from django.db import transaction
+
+from .routers import read_primary
+from .versions import bump_versions, get_version
+from recipes.models import Cart, Favorite
+
+FAVORITES = 'favorites'
+CART = 'cart'
+MEMBERSHIPS = {
+    Favorite: FAVORITES,
+    Cart: CART,
+}
+MEMBERSHIPS_VERSION = 'memberships:{}'
+MEMBERSHIPS_KEY = 'memberships:{}:{}'
+MEMBERSHIPS_TIMEOUT = 60 * 60
+
+
+def get_memberships_key(user_id):
+    version = get_version(MEMBERSHIPS_VERSION.format(user_id))
+    return MEMBERSHIPS_KEY.format(user_id, version)
+
+
+def load_memberships(user_id):
+    key = get_memberships_key(user_id)
+    memberships = cache.get(key)
+    if memberships is None:
+        with read_primary():
+            memberships = {
+                name: set(
+                    model.objects.filter(
+                        user=user_id
+                    ).values_list('recipe', flat=True)
+                )
+                for model, name in MEMBERSHIPS.items()
+            }
+        cache.set(key, memberships, MEMBERSHIPS_TIMEOUT)
+    return memberships
+
+
+def get_memberships(request):
+    memberships = getattr(request, 'memberships', None)
+    if memberships is None:
+        memberships = load_memberships(request.user.pk)
+        request.memberships = memberships
+    return memberships
+
+
+def forget_memberships(user_ids):
+    bump_versions(MEMBERSHIPS_VERSION.format(user) for user in user_ids)
+
+
+def forget_memberships_on_commit(user_ids):
+    user_ids = list(user_ids)
+    transaction.on_commit(lambda: forget_memberships(user_ids))
@@ -0,0 +1,106 @@
+import os
+from contextlib import ExitStack, contextmanager
+from time import perf_counter
+
+from django.db import connections
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Histogram,
+    generate_latest,
+    multiprocess
+)
+
+LABELS = ('view', 'action', 'method', 'status')
+
+REQUEST_TIME = Histogram(
+    'foodgram_request_seconds',
+    'Время обработки запроса',
+    LABELS,
+)
+SQL_QUERIES = Histogram(
+    'foodgram_sql_queries',
+    'Количество SQL-запросов за запрос',
+    LABELS,
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89, 144, 233),
+)
+SQL_TIME = Histogram(
+    'foodgram_sql_seconds',
+    'Время выполнения SQL-запросов за запрос',
+    LABELS,
+)
+SERIALIZER_TIME = Histogram(
+    'foodgram_serializer_seconds',
+    'Время сериализации ответа',
+    LABELS,
+)
+RESPONSE_SIZE = Histogram(
+    'foodgram_response_bytes',
+    'Размер ответа',
+    LABELS,
+    buckets=(256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304),
+)
+
+METRICS_CONTENT_TYPE = CONTENT_TYPE_LATEST
+
+
+class RequestMetrics:
+
+    def __init__(self):
+        self.labels = None
+        self.queries = 0
+        self.sql_time = 0.0
+        self.serializer_time = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.sql_time += perf_counter() - start
+
+    def observe(self, method, status, duration, size):
+        labels = (*self.labels, method, status)
+        REQUEST_TIME.labels(*labels).observe(duration)
+        SQL_QUERIES.labels(*labels).observe(self.queries)
+        SQL_TIME.labels(*labels).observe(self.sql_time)
+        SERIALIZER_TIME.labels(*labels).observe(self.serializer_time)
+        if size is not None:
+            RESPONSE_SIZE.labels(*labels).observe(size)
+
+
+class TimedSerializer:
+
+    def __init__(self, serializer, metrics):
+        self._serializer = serializer
+        self._metrics = metrics
+
+    def __getattr__(self, name):
+        return getattr(self._serializer, name)
+
+    @property
+    def data(self):
+        start = perf_counter()
+        try:
+            return self._serializer.data
+        finally:
+            self._metrics.serializer_time += perf_counter() - start
+
+
+@contextmanager
+def collect_sql(metrics):
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(metrics))
+        yield
+
+
+def render_metrics():
+    registry = REGISTRY
+    if os.getenv('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    return generate_latest(registry)
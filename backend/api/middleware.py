@@ -0,0 +1,117 @@
+import asyncio
+from time import perf_counter
+
+from django.conf import settings
+from rest_framework.permissions import SAFE_METHODS
+
+from .metrics import RequestMetrics, collect_sql
+from .routers import start_routing, stop_routing
+
+
+class MetricsMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = asyncio.iscoroutinefunction(get_response)
+        if self.is_async:
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        request.metrics = RequestMetrics()
+        start = perf_counter()
+        with collect_sql(request.metrics):
+            response = self.get_response(request)
+        return self.observe(request, response, start)
+
+    async def __acall__(self, request):
+        request.metrics = RequestMetrics()
+        start = perf_counter()
+        response = await self.get_response(request)
+        return self.observe(request, response, start)
+
+    def observe(self, request, response, start):
+        metrics = request.metrics
+        if metrics.labels is None:
+            return response
+        if response.streaming:
+            response.streaming_content = self.observe_stream(
+                request, response, response.streaming_content, start
+            )
+            return response
+        metrics.observe(
+            request.method,
+            response.status_code,
+            perf_counter() - start,
+            len(response.content),
+        )
+        return response
+
+    def observe_stream(self, request, response, content, start):
+        metrics = request.metrics
+        content = iter(content)
+        size = 0
+        try:
+            while True:
+                with collect_sql(metrics):
+                    part = next(content, None)
+                if part is None:
+                    return
+                size += len(part)
+                yield part
+        finally:
+            metrics.observe(
+                request.method,
+                response.status_code,
+                perf_counter() - start,
+                size,
+            )
+
+
+class ReplicaMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = asyncio.iscoroutinefunction(get_response)
+        if self.is_async:
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        state, token = self.start(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            stop_routing(token)
+        return self.pin(state, response)
+
+    async def __acall__(self, request):
+        state, token = self.start(request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            stop_routing(token)
+        return self.pin(state, response)
+
+    def start(self, request):
+        return start_routing(
+            pinned=request.method not in SAFE_METHODS
+            or settings.REPLICA_PIN_COOKIE in request.COOKIES
+        )
+
+    def pin(self, state, response):
+        if state is not None and state.written:
+            response.set_cookie(
+                settings.REPLICA_PIN_COOKIE,
+                '1',
+                max_age=settings.REPLICA_PIN_SECONDS,
+                httponly=True,
+                samesite='Lax',
+            )
+        return response
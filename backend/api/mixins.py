@@ -0,0 +1,176 @@
+import time
+from hashlib import sha256
+from http import HTTPStatus
+from urllib.parse import urlencode
+
+from django.core.cache import cache
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+from rest_framework.response import Response
+
+from .metrics import TimedSerializer
+from .routers import read_primary
+from .versions import get_version, get_versions
+
+RESPONSE_KEY = 'response:{}:{}:{}'
+ANONYMOUS_KEY = 'anonymous:{}'
+ANONYMOUS_LOCK_KEY = 'anonymous-lock:{}'
+
+
+class VersionedCacheMixin:
+    cache_version = None
+    cache_timeout = 60 * 60 * 24
+
+    def get_cached_response(self, handler, request, *args, **kwargs):
+        version = get_version(self.cache_version)
+        etag = quote_etag(f'{self.cache_version}-{version}')
+        last_modified = int(version)
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            key = RESPONSE_KEY.format(
+                self.cache_version,
+                version,
+                sha256(request.get_full_path().encode()).hexdigest(),
+            )
+            data = cache.get(key)
+            if data is not None:
+                response = Response(data)
+            else:
+                with read_primary():
+                    response = handler(request, *args, **kwargs)
+                if response.status_code != HTTPStatus.OK:
+                    return response
+                cache.set(key, response.data, self.cache_timeout)
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified)
+        patch_cache_control(response, no_cache=True)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.get_cached_response(
+            super().list, request, *args, **kwargs
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.get_cached_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+
+class AnonymousCacheMixin:
+    anonymous_cache_timeout = 60 * 5
+    anonymous_lock_timeout = 10
+    anonymous_wait = 0.05
+
+    def get_request_surrogates(self):
+        return set()
+
+    def get_response_surrogates(self, data):
+        return set()
+
+    def get_anonymous_key(self, request):
+        params = sorted(
+            (key, value)
+            for key, values in request.query_params.lists()
+            for value in values
+        )
+        url = f'{request.get_host()}{request.path}?{urlencode(params)}'
+        return sha256(url.encode()).hexdigest()
+
+    def get_anonymous_cached(self, key):
+        entry = cache.get(ANONYMOUS_KEY.format(key))
+        if entry is None:
+            return None
+        data, versions = entry
+        if get_versions(versions) != versions:
+            return None
+        return Response(data)
+
+    def make_anonymous_response(self, key, handler, request, *args,
+                                **kwargs):
+        versions = get_versions(self.get_request_surrogates())
+        with read_primary():
+            response = handler(request, *args, **kwargs)
+        if response.status_code != HTTPStatus.OK:
+            return response
+        surrogates = self.get_response_surrogates(response.data)
+        versions = {
+            **get_versions(surrogates - versions.keys()), **versions
+        }
+        cache.set(
+            ANONYMOUS_KEY.format(key),
+            (response.data, versions),
+            self.anonymous_cache_timeout,
+        )
+        return response
+
+    def get_anonymous_response(self, handler, request, *args, **kwargs):
+        if not request.user.is_anonymous:
+            return handler(request, *args, **kwargs)
+        key = self.get_anonymous_key(request)
+        response = self.get_anonymous_cached(key)
+        if response is not None:
+            return response
+        lock = ANONYMOUS_LOCK_KEY.format(key)
+        if cache.add(lock, True, self.anonymous_lock_timeout):
+            try:
+                return self.make_anonymous_response(
+                    key, handler, request, *args, **kwargs
+                )
+            finally:
+                cache.delete(lock)
+        deadline = time.monotonic() + self.anonymous_lock_timeout
+        while cache.get(lock) and time.monotonic() < deadline:
+            time.sleep(self.anonymous_wait)
+        response = self.get_anonymous_cached(key)
+        if response is not None:
+            return response
+        return handler(request, *args, **kwargs)
+
+    def list(self, request, *args, **kwargs):
+        return self.get_anonymous_response(
+            super().list, request, *args, **kwargs
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.get_anonymous_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+
+class CursorPaginationMixin:
+    cursor_pagination_class = None
+
+    @property
+    def paginator(self):
+        if not hasattr(self, '_paginator'):
+            pagination_class = self.pagination_class
+            if (
+                self.cursor_pagination_class is not None
+                and 'cursor' in self.request.query_params
+            ):
+                pagination_class = self.cursor_pagination_class
+            self._paginator = (
+                None if pagination_class is None else pagination_class()
+            )
+        return self._paginator
+
+
+class MetricsMixin:
+
+    def initial(self, request, *args, **kwargs):
+        metrics = getattr(request, 'metrics', None)
+        if metrics is not None:
+            metrics.labels = (
+                type(self).__name__, self.action or request.method.lower()
+            )
+        super().initial(request, *args, **kwargs)
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        metrics = getattr(self.request, 'metrics', None)
+        if metrics is None:
+            return serializer
+        return TimedSerializer(serializer, metrics)
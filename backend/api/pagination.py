@@ -1,7 +1,87 @@
-from rest_framework.pagination import PageNumberPagination
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import (Cursor, CursorPagination,
+                                       PageNumberPagination)
+from rest_framework.settings import api_settings
+
+from .services import get_feed_positions
 
 
 class CustomPagination(PageNumberPagination):
 
     page_size = 6
     page_size_query_param = 'limit'
+
+
+class RecipeCursorPagination(CursorPagination):
+
+    page_size = 6
+    page_size_query_param = 'limit'
+    ordering = ('-pub_date', '-id')
+
+
+class FeedCursorPagination(RecipeCursorPagination):
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.cursor = self.decode_cursor(request)
+        self.reverse = self.cursor is not None and self.cursor.reverse
+        position = None
+        if self.cursor is not None and self.cursor.position is not None:
+            position = self.parse_position(self.cursor.position)
+        filtered = set(request.query_params) - {
+            self.cursor_query_param,
+            self.page_size_query_param,
+            api_settings.URL_FORMAT_OVERRIDE,
+        }
+        positions = get_feed_positions(
+            request.user, self.page_size + 1, position, self.reverse,
+            queryset if filtered else None,
+        )
+        self.has_more = len(positions) > self.page_size
+        self.positions = positions[:self.page_size]
+        if self.reverse:
+            self.positions.reverse()
+        return list(
+            queryset.filter(
+                pk__in=[recipe for _, recipe in self.positions]
+            ).order_by(*self.ordering)
+        )
+
+    def parse_position(self, position):
+        pub_date, _, recipe = position.rpartition('|')
+        try:
+            pub_date = parse_datetime(pub_date)
+        except ValueError:
+            pub_date = None
+        if pub_date is None or not recipe.isdigit():
+            raise NotFound(self.invalid_cursor_message)
+        return pub_date, int(recipe)
+
+    def encode_position(self, position, reverse):
+        pub_date, recipe = position
+        return self.encode_cursor(Cursor(
+            offset=0,
+            reverse=reverse,
+            position=f'{pub_date.isoformat()}|{recipe}',
+        ))
+
+    def get_next_link(self):
+        if not self.positions or not (self.reverse or self.has_more):
+            return None
+        return self.encode_position(self.positions[-1], False)
+
+    def get_previous_link(self):
+        if not self.positions or (
+            not self.has_more if self.reverse else self.cursor is None
+        ):
+            return None
+        return self.encode_position(self.positions[0], True)
+
+
+class FollowCursorPagination(CursorPagination):
+
+    page_size = 6
+    page_size_query_param = 'limit'
+    ordering = ('author_id',)
@@ -0,0 +1,107 @@
+from collections import defaultdict
+
+from recipes.models import IngredientInRecipe, Recipe
+from users.models import Follow, User
+
+from .memberships import CART, FAVORITES, get_memberships
+
+RECIPE_VALUES = (
+    'id',
+    'author',
+    'name',
+    'image',
+    'image_card',
+    'text',
+    'cooking_time',
+    'pub_date',
+    'favorites_count',
+    'carts_count',
+)
+TAG_FIELDS = ('id', 'name', 'color', 'slug')
+AUTHOR_FIELDS = ('email', 'id', 'username', 'first_name', 'last_name')
+INGREDIENT_FIELDS = ('id', 'name', 'amount', 'measurement_unit')
+
+
+def get_recipe_tags(recipe_ids):
+    tags = defaultdict(list)
+    for recipe, *tag in Recipe.tags.through.objects.filter(
+        recipe__in=recipe_ids
+    ).order_by('tag__id').values_list(
+        'recipe', 'tag__id', 'tag__name', 'tag__color', 'tag__slug'
+    ):
+        tags[recipe].append(dict(zip(TAG_FIELDS, tag)))
+    return tags
+
+
+def get_recipe_ingredients(recipe_ids):
+    ingredients = defaultdict(list)
+    for recipe, *ingredient in IngredientInRecipe.objects.filter(
+        recipe__in=recipe_ids
+    ).values_list(
+        'recipe',
+        'ingredients__id',
+        'ingredients__name',
+        'amount',
+        'ingredients__measurement_unit',
+    ):
+        ingredients[recipe].append(dict(zip(INGREDIENT_FIELDS, ingredient)))
+    return ingredients
+
+
+def get_recipe_authors(author_ids, user):
+    subscribed = set()
+    if user.is_authenticated:
+        subscribed = set(
+            Follow.objects.filter(
+                user=user, author__in=author_ids
+            ).values_list('author', flat=True)
+        )
+    return {
+        author[1]: {
+            **dict(zip(AUTHOR_FIELDS, author)),
+            'is_subscribed': author[1] in subscribed,
+        }
+        for author in User.objects.filter(
+            pk__in=author_ids
+        ).order_by().values_list(*AUTHOR_FIELDS)
+    }
+
+
+def get_image_url(row, request):
+    field = 'image_card' if row['image_card'] else 'image'
+    if not row[field]:
+        return None
+    return request.build_absolute_uri(
+        Recipe._meta.get_field(field).storage.url(row[field])
+    )
+
+
+def represent_recipes(rows, request):
+    if not rows:
+        return []
+    user = request.user
+    recipe_ids = [row['id'] for row in rows]
+    tags = get_recipe_tags(recipe_ids)
+    ingredients = get_recipe_ingredients(recipe_ids)
+    authors = get_recipe_authors({row['author'] for row in rows}, user)
+    favorites = cart = ()
+    if user.is_authenticated:
+        memberships = get_memberships(request)
+        favorites, cart = memberships[FAVORITES], memberships[CART]
+    return [
+        {
+            'name': row['name'],
+            'image': get_image_url(row, request),
+            'text': row['text'],
+            'cooking_time': row['cooking_time'],
+            'id': row['id'],
+            'tags': tags[row['id']],
+            'author': authors[row['author']],
+            'ingredients': ingredients[row['id']],
+            'is_favorited': row['id'] in favorites,
+            'is_in_shopping_cart': row['id'] in cart,
+            'favorites_count': row['favorites_count'],
+            'carts_count': row['carts_count'],
+        }
+        for row in rows
+    ]
@@ -0,0 +1,77 @@
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+REPLICA_APP_LABELS = ('recipes', 'users')
+
+routing = ContextVar('routing', default=None)
+
+
+class Routing:
+
+    def __init__(self, pinned=False):
+        self.replica = random.choice(settings.DATABASE_REPLICAS)
+        self.pinned = pinned
+        self.written = False
+        self.primary = 0
+
+
+def start_routing(pinned=False):
+    if not settings.DATABASE_REPLICAS:
+        return None, None
+    state = Routing(pinned)
+    return state, routing.set(state)
+
+
+def stop_routing(token):
+    if token is not None:
+        routing.reset(token)
+
+
+@contextmanager
+def read_primary():
+    state = routing.get()
+    if state is None:
+        yield
+        return
+    state.primary += 1
+    try:
+        yield
+    finally:
+        state.primary -= 1
+
+
+class ReplicaRouter:
+
+    def db_for_read(self, model, **hints):
+        state = routing.get()
+        if state is None:
+            return None
+        if (
+            state.pinned or state.primary
+            or model._meta.app_label not in REPLICA_APP_LABELS
+        ):
+            return DEFAULT_DB_ALIAS
+        return state.replica
+
+    def db_for_write(self, model, **hints):
+        if model._meta.app_label not in REPLICA_APP_LABELS:
+            return None
+        state = routing.get()
+        if state is not None:
+            state.pinned = state.written = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICAS}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
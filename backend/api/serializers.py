@@ -1,19 +1,27 @@
-from django.shortcuts import get_object_or_404
+import os
+
+from django.db import transaction
+from django.db.models import prefetch_related_objects
 from djoser.serializers import UserCreateSerializer, UserSerializer
-from drf_extra_fields.fields import Base64ImageField
 from rest_framework import serializers
 from rest_framework.validators import UniqueTogetherValidator
 
+from .fields import HashedBase64ImageField, RenditionImageField
+from .images import schedule_renditions
+from .memberships import CART, FAVORITES, get_memberships
+from .representations import represent_recipes
+from .services import get_recipe_amounts, update_shopping_lists
 from recipes.models import (
     IngredientInRecipe,
-    Favorite,
     Ingredient,
     Recipe,
-    Cart,
     Tag
 )
+from recipes.search import update_search_index
 from users.models import Follow, User
 
+RECIPES_BATCH_LIMIT = 100
+
 
 class CreateUserSerializer(UserCreateSerializer):
 
@@ -45,6 +53,9 @@ class UsersListSerializer(UserSerializer):
         )
 
     def get_is_subscribed(self, obj):
+        is_subscribed = getattr(obj, 'is_subscribed', None)
+        if is_subscribed is not None:
+            return is_subscribed
         request = self.context.get('request')
         if request is None or request.user.is_anonymous:
             return False
@@ -118,7 +129,7 @@ class RecipeSerializer(serializers.ModelSerializer):
     tags = TagSerializer(many=True)
     is_in_shopping_cart = serializers.SerializerMethodField()
     is_favorited = serializers.SerializerMethodField()
-    image = Base64ImageField()
+    image = RenditionImageField('image_card')
     author = UsersListSerializer(
         read_only=True,
         many=False
@@ -141,23 +152,37 @@ class RecipeSerializer(serializers.ModelSerializer):
             'author',
             'ingredients',
             'is_favorited',
-            'is_in_shopping_cart'
+            'is_in_shopping_cart',
+            'favorites_count',
+            'carts_count'
         )
 
+    def is_member(self, obj, name):
+        request = self.context.get('request')
+        if request is None or request.user.is_anonymous:
+            return False
+        return obj.pk in get_memberships(request)[name]
+
     def get_is_in_shopping_cart(self, obj):
-        user = self.context.get('request').user
-        return Cart.objects.filter(
-            user=user, recipe=obj
-        ).exists() if user.is_authenticated else False
+        return self.is_member(obj, CART)
 
     def get_is_favorited(self, obj):
-        user = self.context.get('request').user
-        if user.is_anonymous:
-            return False
-        return Favorite.objects.filter(
-            user=user,
-            recipe=obj
-        ).exists()
+        return self.is_member(obj, FAVORITES)
+
+
+class FastRecipeListSerializer(serializers.ListSerializer):
+
+    def to_representation(self, data):
+        return represent_recipes(list(data), self.context['request'])
+
+
+class FastRecipeSerializer(serializers.BaseSerializer):
+
+    class Meta:
+        list_serializer_class = FastRecipeListSerializer
+
+    def to_representation(self, instance):
+        return represent_recipes([instance], self.context['request'])[0]
 
 
 class RecipeCreateSerializer(serializers.ModelSerializer):
@@ -165,7 +190,7 @@ class RecipeCreateSerializer(serializers.ModelSerializer):
     tags = serializers.PrimaryKeyRelatedField(
         queryset=Tag.objects.all(), many=True
     )
-    image = Base64ImageField(use_url=True, )
+    image = HashedBase64ImageField(use_url=True, )
     cooking_time = serializers.IntegerField()
 
     class Meta:
@@ -189,17 +214,19 @@ class RecipeCreateSerializer(serializers.ModelSerializer):
         return cooking_time
 
     def check_ingredients(self, data):
-        validated_items = []
-        existed = []
-        for item in data:
-            ingredient = get_object_or_404(Ingredient, pk=item['id'])
-            if ingredient in validated_items:
-                existed.append(ingredient)
-            validated_items.append(ingredient)
-        if existed:
+        ids = [item['id'] for item in data]
+        ingredients = Ingredient.objects.in_bulk(ids)
+        missing = sorted(set(ids) - ingredients.keys())
+        if missing:
+            raise serializers.ValidationError(
+                f'Ингредиенты не найдены: {", ".join(map(str, missing))}'
+            )
+        if len(set(ids)) != len(ids):
             raise serializers.ValidationError(
                 'Этот ингредиент уже добавлен'
             )
+        for item in data:
+            item['ingredient'] = ingredients[item['id']]
 
     def validate(self, data):
         ingredients = data.get('ingredients')
@@ -209,37 +236,54 @@ class RecipeCreateSerializer(serializers.ModelSerializer):
 
     @staticmethod
     def create_ingredients(ingredients, recipe):
-        ingredient_list = []
-        for ingredient in ingredients:
-            amount = ingredient['amount']
-            recipe_ingredient = IngredientInRecipe(
-                ingredients=get_object_or_404(
-                    Ingredient, id=ingredient['id']
-                ),
+        IngredientInRecipe.objects.bulk_create(
+            IngredientInRecipe(
+                ingredients=ingredient['ingredient'],
                 recipe=recipe,
-                amount=amount
+                amount=ingredient['amount']
             )
-            ingredient_list.append(recipe_ingredient)
-        IngredientInRecipe.objects.bulk_create(ingredient_list)
+            for ingredient in ingredients
+        )
 
+    @transaction.atomic
     def create(self, validated_data):
         tags_data = validated_data.pop('tags')
         ingredients_data = validated_data.pop('ingredients')
         image = validated_data.pop('image')
         recipe = Recipe.objects.create(image=image, **validated_data)
         self.create_ingredients(ingredients_data, recipe)
+        update_search_index([recipe.pk])
         recipe.tags.set(tags_data)
+        schedule_renditions(recipe)
         return recipe
 
+    @transaction.atomic
     def update(self, recipe, validated_data):
         ingredients = validated_data.pop('ingredients')
         tags = validated_data.pop('tags')
+        amounts = get_recipe_amounts(recipe, -1)
+        for ingredient in ingredients:
+            amounts[ingredient['id']] = (
+                amounts.get(ingredient['id'], 0) + ingredient['amount']
+            )
         IngredientInRecipe.objects.filter(recipe=recipe).delete()
         self.create_ingredients(ingredients, recipe)
+        update_shopping_lists(
+            recipe.shopping_cart.values_list('user', flat=True), amounts
+        )
         recipe.tags.set(tags)
+        image = validated_data.get('image')
+        if image is not None and (
+            image.name != os.path.basename(recipe.image.name)
+        ):
+            recipe.image_thumbnail = recipe.image_card = ''
+            schedule_renditions(recipe)
         return super().update(recipe, validated_data)
 
     def to_representation(self, recipe):
+        prefetch_related_objects(
+            [recipe], 'tags', 'amount_ingredient__ingredients'
+        )
         return RecipeSerializer(
             recipe,
             context={'request': self.context.get('request')}
@@ -247,7 +291,7 @@ class RecipeCreateSerializer(serializers.ModelSerializer):
 
 
 class RecipeForFollowersSerializer(serializers.ModelSerializer):
-    image = Base64ImageField()
+    image = RenditionImageField('image_thumbnail')
 
     class Meta:
         model = Recipe
@@ -288,16 +332,32 @@ class FollowSerializer(serializers.ModelSerializer):
         ]
 
     def get_recipes(self, obj):
-        request = self.context.get('request')
-        recipes_limit = request.GET.get('recipes_limit')
-        recipes = Recipe.objects.filter(author=obj.author)
-        if recipes_limit:
-            recipes = recipes[:int(recipes_limit)]
+        recipes = getattr(obj, 'recipes_preview', None)
+        if recipes is None:
+            request = self.context.get('request')
+            recipes_limit = request.GET.get('recipes_limit')
+            recipes = Recipe.objects.filter(author=obj.author)
+            if recipes_limit:
+                recipes = recipes[:int(recipes_limit)]
         serializer = RecipeForFollowersSerializer(recipes, many=True)
         return serializer.data
 
     def get_recipes_count(self, obj):
+        recipes_count = getattr(obj, 'recipes_count', None)
+        if recipes_count is not None:
+            return recipes_count
         return Recipe.objects.filter(author=obj.author).count()
 
     def get_is_subscribed(self, obj):
+        is_subscribed = getattr(obj, 'is_subscribed', None)
+        if is_subscribed is not None:
+            return is_subscribed
         return Follow.objects.filter(user=obj.user, author=obj.author).exists()
+
+
+class RecipeIdsSerializer(serializers.Serializer):
+    recipes = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=RECIPES_BATCH_LIMIT
+    )
@@ -1,17 +1,438 @@
-from django.http import HttpResponse
+import csv
+import heapq
+import os
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from tempfile import SpooledTemporaryFile
 
+from django.conf import settings
+from django.db import transaction
+from django.db.models import (
+    Case,
+    Count,
+    F,
+    FloatField,
+    OuterRef,
+    Q,
+    Subquery,
+    Sum,
+    Value,
+    When,
+    Window
+)
+from django.db.models.functions import Coalesce, RowNumber
+from django.http import StreamingHttpResponse
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.pdfgen import canvas
 
-def make_cart_txt(user, ingredients):
-    response = HttpResponse(
-        content_type='text/plain',
-        charset='utf-8',
-    )
-    response['Content-Disposition'] = 'attachment; filename="listbuy.txt"'
-    response.write('Список продуктов:\n')
-    for ingredient in ingredients:
-        response.write(
-            f'{ingredient["ingredients__name"]} '
-            f'{ingredient["value"]} '
-            f'{ingredient["ingredients__measurement_unit"]}\n'
+from .memberships import forget_memberships_on_commit
+from recipes.models import (
+    Cart,
+    Favorite,
+    IngredientInRecipe,
+    Recipe,
+    ShoppingList,
+    Timeline
+)
+from users.models import Follow, User
+
+CART_TITLE = 'Список продуктов:'
+CART_HEADER = ('Ингредиент', 'Количество', 'Единица измерения')
+CART_FILENAME = 'listbuy'
+PDF_FONT = 'CartFont'
+PDF_FONT_SIZE = 12
+PDF_MARGIN = 50
+PDF_LINE_HEIGHT = 18
+STREAM_CHUNK_SIZE = 64 * 1024
+RECIPE_COUNTERS = {
+    Favorite: 'favorites_count',
+    Cart: 'carts_count',
+}
+RECIPE_NOT_FOUND = 'Рецепт не найден'
+RECIPE_ALREADY_ADDED = 'Рецепт уже добавлен'
+RECIPE_NOT_ADDED = 'Рецепт не был добавлен'
+
+batched_cart_deletes = ContextVar('batched_cart_deletes', default=False)
+
+
+class Echo:
+
+    def write(self, value):
+        return value
+
+
+def get_cart_rows(ingredients):
+    return [
+        (
+            ingredient['ingredient__name'],
+            ingredient['amount'],
+            ingredient['ingredient__measurement_unit'],
         )
+        for ingredient in ingredients
+    ]
+
+
+def make_cart_txt(rows):
+    yield f'{CART_TITLE}\n'
+    for name, value, measurement_unit in rows:
+        yield f'{name} {value} {measurement_unit}\n'
+
+
+def make_cart_csv(rows):
+    writer = csv.writer(Echo())
+    yield writer.writerow(CART_HEADER)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def get_pdf_font():
+    if PDF_FONT in pdfmetrics.getRegisteredFontNames():
+        return PDF_FONT
+    if not os.path.exists(settings.CART_PDF_FONT):
+        return 'Helvetica'
+    pdfmetrics.registerFont(TTFont(PDF_FONT, settings.CART_PDF_FONT))
+    return PDF_FONT
+
+
+def make_cart_pdf(rows):
+    font = get_pdf_font()
+    width, height = A4
+    with SpooledTemporaryFile(max_size=STREAM_CHUNK_SIZE) as buffer:
+        document = canvas.Canvas(buffer, pagesize=A4)
+        document.setFont(font, PDF_FONT_SIZE)
+        document.drawString(PDF_MARGIN, height - PDF_MARGIN, CART_TITLE)
+        position = height - PDF_MARGIN - PDF_LINE_HEIGHT
+        for name, value, measurement_unit in rows:
+            if position < PDF_MARGIN:
+                document.showPage()
+                document.setFont(font, PDF_FONT_SIZE)
+                position = height - PDF_MARGIN
+            document.drawString(
+                PDF_MARGIN, position, f'{name} {value} {measurement_unit}'
+            )
+            position -= PDF_LINE_HEIGHT
+        document.save()
+        buffer.seek(0)
+        yield from iter(lambda: buffer.read(STREAM_CHUNK_SIZE), b'')
+
+
+CART_FORMATS = {
+    'txt': (make_cart_txt, 'text/plain; charset=utf-8'),
+    'csv': (make_cart_csv, 'text/csv; charset=utf-8'),
+    'pdf': (make_cart_pdf, 'application/pdf'),
+}
+
+
+def make_cart_response(ingredients, cart_format):
+    make_cart, content_type = CART_FORMATS[cart_format]
+    response = StreamingHttpResponse(
+        make_cart(get_cart_rows(ingredients)),
+        content_type=content_type,
+    )
+    response['Content-Disposition'] = (
+        f'attachment; filename="{CART_FILENAME}.{cart_format}"'
+    )
     return response
+
+
+def get_authors_recipes(author_ids, recipes_limit=None):
+    authors_recipes = defaultdict(list)
+    if not author_ids:
+        return authors_recipes
+    recipes = Recipe.objects.filter(author__in=author_ids)
+    if recipes_limit:
+        sql, params = recipes.annotate(
+            row_number=Window(
+                expression=RowNumber(),
+                partition_by=F('author'),
+                order_by=F('pub_date').desc(),
+            )
+        ).query.sql_with_params()
+        recipes = Recipe.objects.raw(
+            f'SELECT * FROM ({sql}) AS ranked '
+            f'WHERE row_number <= %s ORDER BY pub_date DESC',
+            (*params, int(recipes_limit)),
+        )
+    for recipe in recipes:
+        authors_recipes[recipe.author_id].append(recipe)
+    return authors_recipes
+
+
+def get_recipe_amounts(recipe, factor=1):
+    return {
+        ingredient: amount * factor
+        for ingredient, amount in IngredientInRecipe.objects.filter(
+            recipe=recipe
+        ).values_list('ingredients', 'amount')
+    }
+
+
+def get_recipes_amounts(recipe_ids, factor=1):
+    return {
+        ingredient: amount * factor
+        for ingredient, amount in IngredientInRecipe.objects.filter(
+            recipe__in=recipe_ids
+        ).values('ingredients').annotate(
+            total=Sum('amount')
+        ).order_by().values_list('ingredients', 'total')
+    }
+
+
+def lock_users(user_ids):
+    return list(
+        User.objects.select_for_update().filter(
+            pk__in=user_ids
+        ).order_by('pk').values_list('pk', flat=True)
+    )
+
+
+@transaction.atomic
+def update_shopping_lists(user_ids, amounts):
+    amounts = {
+        ingredient: amount for ingredient, amount in amounts.items() if amount
+    }
+    user_ids = lock_users(user_ids)
+    if not amounts or not user_ids:
+        return
+    shopping_lists = ShoppingList.objects.filter(
+        user__in=user_ids, ingredient__in=amounts
+    )
+    shopping_lists.update(
+        amount=F('amount') + Case(
+            *(
+                When(ingredient=ingredient, then=Value(amount))
+                for ingredient, amount in amounts.items()
+            ),
+            output_field=FloatField(),
+        )
+    )
+    existed = set(shopping_lists.values_list('user', 'ingredient'))
+    ShoppingList.objects.bulk_create(
+        ShoppingList(user_id=user, ingredient_id=ingredient, amount=amount)
+        for user in user_ids
+        for ingredient, amount in amounts.items()
+        if amount > 0 and (user, ingredient) not in existed
+    )
+    shopping_lists.filter(amount__lte=0).delete()
+
+
+def update_recipe_shopping_lists(recipe, amounts):
+    for ingredient, amount in get_recipe_amounts(recipe).items():
+        amounts[ingredient] = amounts.get(ingredient, 0) + amount
+    update_shopping_lists(
+        recipe.shopping_cart.values_list('user', flat=True), amounts
+    )
+
+
+@contextmanager
+def batch_cart_deletes():
+    token = batched_cart_deletes.set(True)
+    try:
+        yield
+    finally:
+        batched_cart_deletes.reset(token)
+
+
+def iter_live_shopping_lists(**filters):
+    for item in IngredientInRecipe.objects.filter(
+        recipe__shopping_cart__isnull=False, **filters
+    ).values(
+        'recipe__shopping_cart__user', 'ingredients'
+    ).annotate(
+        amount=Sum('amount')
+    ).order_by().iterator():
+        yield (
+            item['recipe__shopping_cart__user'],
+            item['ingredients'],
+            item['amount'],
+        )
+
+
+def get_live_shopping_lists(**filters):
+    return {
+        (user, ingredient): amount
+        for user, ingredient, amount in iter_live_shopping_lists(**filters)
+    }
+
+
+def fill_timelines(follows):
+    rows = follows.filter(
+        author__feed_fan_in=False, author__recipes__isnull=False
+    ).values_list(
+        'user', 'author__recipes', 'author__recipes__pub_date'
+    ).order_by()
+    Timeline.objects.bulk_create(
+        (
+            Timeline(user_id=user, recipe_id=recipe, pub_date=pub_date)
+            for user, recipe, pub_date in rows.iterator()
+        ),
+        batch_size=1000,
+        ignore_conflicts=True,
+    )
+
+
+def fan_out_recipe(recipe):
+    author = recipe.author
+    if author is None or author.feed_fan_in:
+        return
+    followers = Follow.objects.filter(author=author).values_list(
+        'user', flat=True
+    )
+    limit = settings.FEED_FAN_OUT_LIMIT
+    if followers[:limit + 1].count() > limit:
+        User.objects.filter(pk=author.pk).update(feed_fan_in=True)
+        author.feed_fan_in = True
+        Timeline.objects.filter(recipe__author=author).delete()
+        return
+    Timeline.objects.bulk_create(
+        (
+            Timeline(user_id=user, recipe=recipe, pub_date=recipe.pub_date)
+            for user in followers.iterator()
+        ),
+        batch_size=1000,
+        ignore_conflicts=True,
+    )
+
+
+def trim_timeline(user, author):
+    Timeline.objects.filter(user=user, recipe__author=author).delete()
+
+
+def get_feed_keyset(position, reverse, recipe_field):
+    if position is None:
+        return Q()
+    pub_date, recipe = position
+    lookup = 'gt' if reverse else 'lt'
+    return Q(**{f'pub_date__{lookup}': pub_date}) | Q(
+        pub_date=pub_date, **{f'{recipe_field}__{lookup}': recipe}
+    )
+
+
+def get_feed_positions(user, size, position=None, reverse=False,
+                       recipes=None):
+    direction = '' if reverse else '-'
+    if recipes is None:
+        recipes = Recipe.objects.all()
+        timeline = Timeline.objects.filter(
+            get_feed_keyset(position, reverse, 'recipe_id'), user=user
+        ).order_by(
+            f'{direction}pub_date', f'{direction}recipe_id'
+        ).values_list('pub_date', 'recipe_id')
+    else:
+        timeline = recipes.filter(
+            get_feed_keyset(position, reverse, 'id'), timeline__user=user
+        ).order_by(
+            f'{direction}pub_date', f'{direction}id'
+        ).values_list('pub_date', 'id')
+    fan_in = recipes.filter(
+        get_feed_keyset(position, reverse, 'id'),
+        author__in=Follow.objects.filter(
+            user=user, author__feed_fan_in=True
+        ).values('author'),
+    ).order_by(
+        f'{direction}pub_date', f'{direction}id'
+    ).values_list('pub_date', 'id')
+    positions = []
+    for item in heapq.merge(
+        timeline[:size], fan_in[:size], reverse=not reverse
+    ):
+        if positions and positions[-1] == item:
+            continue
+        positions.append(item)
+        if len(positions) == size:
+            break
+    return positions
+
+
+def change_recipe_counter(recipes, field, delta):
+    recipes.update(**{field: F(field) + delta})
+
+
+def get_recipe_counters():
+    return {
+        field: Coalesce(
+            Subquery(
+                model.objects.filter(
+                    recipe=OuterRef('pk')
+                ).order_by().values('recipe').annotate(
+                    count=Count('pk')
+                ).values('count')
+            ),
+            0
+        )
+        for model, field in RECIPE_COUNTERS.items()
+    }
+
+
+@transaction.atomic
+def add_recipes(model, user, recipe_ids):
+    lock_users([user.pk])
+    found = set(
+        Recipe.objects.filter(pk__in=recipe_ids).values_list('pk', flat=True)
+    )
+    added = set(
+        model.objects.filter(
+            user=user, recipe__in=found
+        ).values_list('recipe', flat=True)
+    )
+    applied = sorted(found - added)
+    model.objects.bulk_create(
+        (model(user=user, recipe_id=recipe) for recipe in applied),
+        ignore_conflicts=True,
+    )
+    change_recipe_counter(
+        Recipe.objects.filter(pk__in=applied), RECIPE_COUNTERS[model], 1
+    )
+    if model is Cart:
+        update_shopping_lists([user.pk], get_recipes_amounts(applied))
+    forget_memberships_on_commit([user.pk])
+    rejected = [
+        {
+            'id': recipe,
+            'error': RECIPE_ALREADY_ADDED if recipe in added
+            else RECIPE_NOT_FOUND,
+        }
+        for recipe in dict.fromkeys(recipe_ids)
+        if recipe not in found or recipe in added
+    ]
+    return applied, rejected
+
+
+@transaction.atomic
+def remove_recipes(model, user, recipe_ids):
+    lock_users([user.pk])
+    applied = sorted(
+        model.objects.filter(
+            user=user, recipe__in=recipe_ids
+        ).values_list('recipe', flat=True)
+    )
+    with batch_cart_deletes():
+        model.objects.filter(user=user, recipe__in=applied).delete()
+    change_recipe_counter(
+        Recipe.objects.filter(pk__in=applied), RECIPE_COUNTERS[model], -1
+    )
+    if model is Cart:
+        update_shopping_lists([user.pk], get_recipes_amounts(applied, -1))
+    removed = set(applied)
+    rejected = [
+        {'id': recipe, 'error': RECIPE_NOT_ADDED}
+        for recipe in dict.fromkeys(recipe_ids)
+        if recipe not in removed
+    ]
+    return applied, rejected
+
+
+@transaction.atomic
+def clear_cart(user):
+    lock_users([user.pk])
+    applied = sorted(user.shopping_cart.values_list('recipe', flat=True))
+    with batch_cart_deletes():
+        Cart.objects.filter(user=user).delete()
+    change_recipe_counter(
+        Recipe.objects.filter(pk__in=applied), 'carts_count', -1
+    )
+    ShoppingList.objects.filter(user=user).delete()
+    return applied
@@ -0,0 +1,145 @@
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from .authentication import forget_tokens, forget_user_tokens
+from .memberships import forget_memberships_on_commit
+from .surrogates import (
+    AUTHOR,
+    RECIPE,
+    RECIPE_LIST,
+    TAG,
+    purge,
+    purge_recipes
+)
+from .services import (
+    RECIPE_COUNTERS,
+    batched_cart_deletes,
+    change_recipe_counter,
+    fan_out_recipe,
+    fill_timelines,
+    get_recipe_amounts,
+    trim_timeline,
+    update_shopping_lists
+)
+from .versions import INGREDIENTS, TAGS, bump_version
+from recipes.models import Cart, Favorite, Ingredient, Recipe, Tag
+from recipes.search import update_search_index
+from users.models import Follow, User
+
+
+@receiver((post_save, post_delete), sender=Ingredient)
+def bump_ingredients_version(**kwargs):
+    bump_version(INGREDIENTS)
+
+
+@receiver(post_save, sender=Ingredient)
+def update_ingredient_recipes_search(instance, created, **kwargs):
+    if not created:
+        update_search_index(
+            instance.amount_ingredient.values_list('recipe', flat=True)
+        )
+
+
+@receiver(post_save, sender=Recipe)
+def update_recipe_search(instance, **kwargs):
+    update_search_index([instance.pk])
+
+
+@receiver(post_save, sender=Recipe)
+def fan_out_new_recipe(instance, created, **kwargs):
+    if created:
+        fan_out_recipe(instance)
+
+
+@receiver(post_save, sender=Follow)
+def backfill_follower_timeline(instance, created, **kwargs):
+    if created:
+        fill_timelines(Follow.objects.filter(pk=instance.pk))
+
+
+@receiver(post_delete, sender=Follow)
+def trim_follower_timeline(instance, **kwargs):
+    trim_timeline(instance.user_id, instance.author_id)
+
+
+@receiver((post_save, post_delete), sender=Tag)
+def bump_tags_version(**kwargs):
+    bump_version(TAGS)
+
+
+@receiver(pre_delete, sender=User)
+def release_recipe_counters(instance, **kwargs):
+    for model, field in RECIPE_COUNTERS.items():
+        change_recipe_counter(
+            Recipe.objects.filter(
+                pk__in=model.objects.filter(user=instance).values('recipe')
+            ),
+            field,
+            -1
+        )
+
+
+@receiver(post_save, sender=Cart)
+def fill_cart_shopping_list(instance, created, **kwargs):
+    if created:
+        update_shopping_lists(
+            [instance.user_id], get_recipe_amounts(instance.recipe_id)
+        )
+
+
+@receiver(pre_delete, sender=Cart)
+def release_cart_shopping_list(instance, **kwargs):
+    if batched_cart_deletes.get():
+        return
+    update_shopping_lists(
+        [instance.user_id], get_recipe_amounts(instance.recipe_id, -1)
+    )
+
+
+@receiver(post_delete, sender=Token)
+def forget_deleted_token(instance, **kwargs):
+    forget_tokens(instance.key)
+
+
+@receiver(post_save, sender=User)
+def forget_changed_user_tokens(instance, created, **kwargs):
+    if not created:
+        forget_user_tokens(instance)
+
+
+@receiver((post_save, post_delete), sender=Favorite)
+@receiver((post_save, post_delete), sender=Cart)
+def forget_changed_memberships(instance, **kwargs):
+    forget_memberships_on_commit([instance.user_id])
+
+
+@receiver((post_save, post_delete), sender=Recipe)
+def purge_recipe(instance, **kwargs):
+    purge(RECIPE_LIST, RECIPE.format(instance.pk))
+
+
+@receiver(post_save, sender=Ingredient)
+def purge_ingredient_recipes(instance, created, **kwargs):
+    if not created:
+        purge_recipes(
+            instance.amount_ingredient.values_list('recipe', flat=True)
+        )
+
+
+@receiver(pre_delete, sender=Ingredient)
+def purge_deleted_ingredient_recipes(instance, **kwargs):
+    purge_recipes(
+        instance.amount_ingredient.values_list('recipe', flat=True)
+    )
+
+
+@receiver((post_save, post_delete), sender=Tag)
+def purge_tag(instance, **kwargs):
+    purge(RECIPE_LIST, TAG.format(instance.pk))
+
+
+@receiver(post_save, sender=User)
+def purge_author(instance, created, **kwargs):
+    if not created:
+        purge(AUTHOR.format(instance.pk))
@@ -0,0 +1,25 @@
+from django.db import transaction
+
+from .versions import bump_versions
+
+RECIPE_LIST = 'recipe-list'
+RECIPE = 'recipe:{}'
+AUTHOR = 'author:{}'
+TAG = 'tag:{}'
+
+
+def get_recipe_surrogates(recipes):
+    surrogates = set()
+    for recipe in recipes:
+        surrogates.add(RECIPE.format(recipe['id']))
+        surrogates.add(AUTHOR.format(recipe['author']['id']))
+        surrogates.update(TAG.format(tag['id']) for tag in recipe['tags'])
+    return surrogates
+
+
+def purge(*surrogates):
+    transaction.on_commit(lambda: bump_versions(surrogates))
+
+
+def purge_recipes(recipe_ids):
+    purge(RECIPE_LIST, *(RECIPE.format(recipe) for recipe in recipe_ids))
@@ -1,7 +1,15 @@
-from django.urls import include, path
+from django.conf import settings
+from django.urls import URLPattern, include, path
 from rest_framework.routers import DefaultRouter
 
-from .views import RecipeViewSet, UsersViewSet, TagViewSet, IngredientViewSet
+from .asynchronous import async_view
+from .views import (
+    RecipeViewSet,
+    UsersViewSet,
+    TagViewSet,
+    IngredientViewSet,
+    MetricsView
+)
 
 app_name = 'api'
 
@@ -11,8 +19,32 @@ router_v1.register('users', UsersViewSet, basename='users')
 router_v1.register('tags', TagViewSet, basename='tags')
 router_v1.register('ingredients', IngredientViewSet, basename='ingredients')
 
+ASYNC_ROUTES = (
+    'recipes-list',
+    'recipes-detail',
+    'recipes-download-shopping-cart',
+    'tags-list',
+    'tags-detail',
+    'ingredients-list',
+    'ingredients-detail',
+    'users-subscriptions',
+)
+
+router_urls = router_v1.urls
+if settings.ASYNC_VIEWS:
+    router_urls = [
+        URLPattern(
+            pattern.pattern,
+            async_view(pattern.callback),
+            pattern.default_args,
+            pattern.name,
+        ) if pattern.name in ASYNC_ROUTES else pattern
+        for pattern in router_urls
+    ]
+
 urlpatterns = [
-    path('', include(router_v1.urls)),
+    path('metrics/', MetricsView.as_view(), name='metrics'),
+    path('', include(router_urls)),
     path('', include('djoser.urls')),
     path('auth/', include('djoser.urls.authtoken'))
 ]
@@ -0,0 +1,38 @@
+import time
+
+from django.core.cache import cache
+
+INGREDIENTS = 'ingredients'
+TAGS = 'tags'
+VERSION_KEY = 'content_version:{}'
+
+
+def get_version(name):
+    key = VERSION_KEY.format(name)
+    version = cache.get(key)
+    if version is not None:
+        return version
+    cache.add(key, time.time(), timeout=None)
+    return cache.get(key)
+
+
+def bump_version(name):
+    cache.set(VERSION_KEY.format(name), time.time(), timeout=None)
+
+
+def bump_versions(names):
+    version = time.time()
+    cache.set_many(
+        {VERSION_KEY.format(name): version for name in names}, timeout=None
+    )
+
+
+def get_versions(names):
+    keys = {VERSION_KEY.format(name): name for name in names}
+    versions = cache.get_many(keys)
+    missing = keys.keys() - versions.keys()
+    if missing:
+        for key in missing:
+            cache.add(key, time.time(), timeout=None)
+        versions.update(cache.get_many(missing))
+    return {keys[key]: version for key, version in versions.items()}
@@ -1,53 +1,110 @@
 from http import HTTPStatus
 
-from django.db.models import Sum
+from django.conf import settings
+from django.db import transaction
+from django.db.models import (
+    BooleanField,
+    Count,
+    Exists,
+    OuterRef,
+    Prefetch,
+    Value
+)
 from django_filters.rest_framework import DjangoFilterBackend
 from djoser.views import UserViewSet
+from django.http import HttpResponse
 from rest_framework import filters, status, viewsets
 from rest_framework.decorators import action
 from rest_framework.generics import get_object_or_404
-from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.permissions import AllowAny, IsAdminUser, IsAuthenticated
 from rest_framework.response import Response
+from rest_framework.views import APIView
 
-from .filters import IngredientFilter, RecipeFilter
-from .pagination import CustomPagination
+from .filters import (IngredientFilter, RecipeFilter, RecipeOrderingFilter,
+                      RecipeSearchFilter)
+from .indexes import ingredient_index
+from .metrics import METRICS_CONTENT_TYPE, render_metrics
+from .mixins import (
+    AnonymousCacheMixin,
+    CursorPaginationMixin,
+    MetricsMixin,
+    VersionedCacheMixin
+)
+from .negotiation import FallbackContentNegotiation
+from .pagination import (
+    CustomPagination,
+    FeedCursorPagination,
+    FollowCursorPagination,
+    RecipeCursorPagination
+)
 from .permissions import IsAdminOrReadOnly, IsAdminOrAuthor
+from .renderers import CartCsvRenderer, CartPdfRenderer, CartTxtRenderer
+from .representations import RECIPE_VALUES
 from .serializers import (
     UsersListSerializer,
     TagSerializer,
     IngredientSerializer,
+    FastRecipeSerializer,
     RecipeSerializer,
     RecipeCreateSerializer,
     FollowSerializer,
-    RecipeForFollowersSerializer
+    RecipeForFollowersSerializer,
+    RecipeIdsSerializer
+)
+from .services import (
+    RECIPE_ALREADY_ADDED,
+    RECIPE_COUNTERS,
+    add_recipes,
+    change_recipe_counter,
+    clear_cart,
+    get_authors_recipes,
+    make_cart_response,
+    remove_recipes
 )
-from .services import make_cart_txt
+from .surrogates import (
+    RECIPE,
+    RECIPE_LIST,
+    get_recipe_surrogates
+)
+from .versions import INGREDIENTS, TAGS
 from recipes.models import (
     Ingredient,
     Recipe,
     Cart,
     Tag,
     Favorite,
-    IngredientInRecipe
+    ShoppingList
 )
 from users.models import Follow, User
 
+READ_ACTIONS = ('list', 'retrieve', 'feed')
+
 
-class TagViewSet(viewsets.ModelViewSet):
+class TagViewSet(MetricsMixin, VersionedCacheMixin, viewsets.ModelViewSet):
+    cache_version = TAGS
     queryset = Tag.objects.all()
     serializer_class = TagSerializer
     permission_classes = (IsAdminOrReadOnly,)
 
 
-class IngredientViewSet(viewsets.ModelViewSet):
+class IngredientViewSet(
+    MetricsMixin, VersionedCacheMixin, viewsets.ModelViewSet
+):
+    cache_version = INGREDIENTS
     queryset = Ingredient.objects.all()
     serializer_class = IngredientSerializer
     permission_classes = (IsAdminOrAuthor,)
     filter_backends = (DjangoFilterBackend, filters.SearchFilter,)
     filterset_class = IngredientFilter
 
+    def filter_queryset(self, queryset):
+        name = self.request.query_params.get('name')
+        if self.action == 'list' and name:
+            return ingredient_index.search(name)
+        return super().filter_queryset(queryset)
 
-class UsersViewSet(UserViewSet):
+
+class UsersViewSet(MetricsMixin, CursorPaginationMixin, UserViewSet):
     queryset = User.objects.all()
     serializer_class = UsersListSerializer
     filter_backends = (DjangoFilterBackend, filters.SearchFilter,)
@@ -58,27 +115,38 @@ class UsersViewSet(UserViewSet):
     @action(
         methods=['GET'],
         detail=False,
-        permission_classes=(IsAuthenticated,)
+        permission_classes=(IsAuthenticated,),
+        cursor_pagination_class=FollowCursorPagination,
+        serializer_class=FollowSerializer
     )
     def subscriptions(self, request):
         user = request.user
-        queryset = Follow.objects.filter(user=user)
+        queryset = Follow.objects.filter(user=user).select_related(
+            'author'
+        ).annotate(
+            recipes_count=Count('author__recipes'),
+            is_subscribed=Value(True, output_field=BooleanField()),
+        ).order_by('author')
         page = self.paginate_queryset(queryset)
-        serializer = FollowSerializer(
-            page, many=True, context={'request': request}
+        authors_recipes = get_authors_recipes(
+            [follow.author_id for follow in page],
+            request.GET.get('recipes_limit'),
         )
+        for follow in page:
+            follow.recipes_preview = authors_recipes[follow.author_id]
+        serializer = self.get_serializer(page, many=True)
         return self.get_paginated_response(serializer.data)
 
     @action(
         methods=['POST', 'DELETE'],
         detail=True,
+        serializer_class=FollowSerializer
     )
     def subscribe(self, request, id):
         author = get_object_or_404(User, id=id)
         if request.method == 'POST':
-            serializer = FollowSerializer(
-                Follow.objects.create(user=request.user, author=author),
-                context={'request': request},
+            serializer = self.get_serializer(
+                Follow.objects.create(user=request.user, author=author)
             )
             return Response(
                 serializer.data, status=status.HTTP_201_CREATED
@@ -87,32 +155,104 @@ class UsersViewSet(UserViewSet):
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
-class RecipeViewSet(viewsets.ModelViewSet):
+class RecipeViewSet(
+    MetricsMixin,
+    CursorPaginationMixin,
+    AnonymousCacheMixin,
+    viewsets.ModelViewSet
+):
     queryset = Recipe.objects.all()
     permission_classes = (IsAdminOrAuthor,)
     pagination_class = CustomPagination
-    filter_backends = (DjangoFilterBackend,)
+    cursor_pagination_class = RecipeCursorPagination
+    filter_backends = (
+        DjangoFilterBackend, RecipeSearchFilter, RecipeOrderingFilter
+    )
     filterset_class = RecipeFilter
+    ordering_fields = ('pub_date', 'favorites_count')
+    ordering = ('-pub_date', '-id')
+
+    def get_queryset(self):
+        if self.action in READ_ACTIONS and settings.RECIPE_FAST_PATH:
+            return Recipe.objects.values(*RECIPE_VALUES)
+        user = self.request.user
+        queryset = Recipe.objects.prefetch_related(
+            'tags',
+            'amount_ingredient__ingredients',
+        )
+        if user.is_anonymous:
+            return queryset.select_related('author')
+        authors = User.objects.annotate(
+            is_subscribed=Exists(
+                Follow.objects.filter(user=user, author=OuterRef('pk'))
+            )
+        )
+        return queryset.prefetch_related(
+            Prefetch('author', queryset=authors)
+        )
+
+    def get_request_surrogates(self):
+        if self.action == 'list':
+            return {RECIPE_LIST}
+        return {RECIPE.format(self.kwargs['pk'])}
+
+    def get_response_surrogates(self, data):
+        if self.action == 'list':
+            return get_recipe_surrogates(data['results'])
+        return get_recipe_surrogates([data])
 
     def get_serializer_class(self):
-        return RecipeSerializer if self.action in (
-            'list', 'retrieve'
-        ) else RecipeCreateSerializer
+        if self.action not in READ_ACTIONS:
+            return RecipeCreateSerializer
+        if settings.RECIPE_FAST_PATH:
+            return FastRecipeSerializer
+        return RecipeSerializer
 
     def perform_create(self, serializer):
         serializer.save(author=self.request.user)
 
+    def finalize_response(self, request, response, *args, **kwargs):
+        if (
+            self.action == 'download_shopping_cart'
+            and isinstance(response, Response)
+        ):
+            request.accepted_renderer = (
+                self.settings.DEFAULT_RENDERER_CLASSES[0]()
+            )
+            request.accepted_media_type = request.accepted_renderer.media_type
+        return super().finalize_response(request, response, *args, **kwargs)
+
     @staticmethod
+    @transaction.atomic
     def _add_recipe(model, request, pk):
         recipe = get_object_or_404(Recipe, id=pk)
-        model.objects.create(recipe=recipe, user=request.user)
+        _, created = model.objects.get_or_create(
+            recipe=recipe, user=request.user
+        )
+        if not created:
+            return Response(
+                {'errors': RECIPE_ALREADY_ADDED},
+                status=HTTPStatus.BAD_REQUEST
+            )
+        if model in RECIPE_COUNTERS:
+            change_recipe_counter(
+                Recipe.objects.filter(pk=recipe.pk), RECIPE_COUNTERS[model], 1
+            )
         serializer = RecipeForFollowersSerializer(recipe)
         return Response(data=serializer.data, status=HTTPStatus.CREATED)
 
     @staticmethod
+    @transaction.atomic
     def _delete_recipe(model, request, pk):
         recipe = get_object_or_404(Recipe, id=pk)
-        model.objects.filter(recipe=recipe, user=request.user).delete()
+        deleted, _ = model.objects.filter(
+            recipe=recipe, user=request.user
+        ).delete()
+        if deleted and model in RECIPE_COUNTERS:
+            change_recipe_counter(
+                Recipe.objects.filter(pk=recipe.pk),
+                RECIPE_COUNTERS[model], -1
+            )
         return Response(status=HTTPStatus.NO_CONTENT)
 
     @action(
@@ -140,26 +280,110 @@ class RecipeViewSet(viewsets.ModelViewSet):
         methods=['POST', 'DELETE'],
         permission_classes=(IsAuthenticated,)
     )
+    @transaction.atomic
     def shopping_cart(self, request, pk):
+        recipe = get_object_or_404(Recipe, id=pk)
         if request.method == 'POST':
-            return self._add_recipe(Cart, request, pk)
-        return self._delete_recipe(Cart, request, pk)
+            _, created = Cart.objects.get_or_create(
+                recipe=recipe, user=request.user
+            )
+            if not created:
+                return Response(
+                    {'errors': RECIPE_ALREADY_ADDED},
+                    status=HTTPStatus.BAD_REQUEST
+                )
+            change_recipe_counter(
+                Recipe.objects.filter(pk=recipe.pk), 'carts_count', 1
+            )
+            serializer = RecipeForFollowersSerializer(recipe)
+            return Response(data=serializer.data, status=HTTPStatus.CREATED)
+        deleted, _ = Cart.objects.filter(
+            recipe=recipe, user=request.user
+        ).delete()
+        if deleted:
+            change_recipe_counter(
+                Recipe.objects.filter(pk=recipe.pk), 'carts_count', -1
+            )
+        return Response(status=HTTPStatus.NO_CONTENT)
+
+    @staticmethod
+    def _change_recipes(model, request):
+        serializer = RecipeIdsSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        change = add_recipes if request.method == 'POST' else remove_recipes
+        applied, rejected = change(
+            model, request.user, serializer.validated_data['recipes']
+        )
+        return Response({'applied': applied, 'rejected': rejected})
+
+    @action(
+        detail=False,
+        methods=['POST', 'DELETE'],
+        permission_classes=(IsAuthenticated,),
+        url_path='favorite'
+    )
+    def favorite_batch(self, request):
+        return self._change_recipes(Favorite, request)
+
+    @action(
+        detail=False,
+        methods=['POST', 'DELETE'],
+        permission_classes=(IsAuthenticated,),
+        url_path='shopping_cart'
+    )
+    def shopping_cart_batch(self, request):
+        return self._change_recipes(Cart, request)
+
+    @action(
+        detail=False,
+        methods=['DELETE'],
+        permission_classes=(IsAuthenticated,),
+        url_path='shopping_cart/clear'
+    )
+    def clear_shopping_cart(self, request):
+        return Response({'applied': clear_cart(request.user), 'rejected': []})
 
     @action(
         detail=False,
         methods=['GET'],
-        permission_classes=(IsAuthenticated,)
+        permission_classes=(IsAuthenticated,),
+        pagination_class=FeedCursorPagination,
+        cursor_pagination_class=FeedCursorPagination
+    )
+    def feed(self, request):
+        page = self.paginate_queryset(
+            self.filter_queryset(self.get_queryset())
+        )
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+    @action(
+        detail=False,
+        methods=['GET'],
+        permission_classes=(IsAuthenticated,),
+        renderer_classes=(CartTxtRenderer, CartCsvRenderer, CartPdfRenderer),
+        content_negotiation_class=FallbackContentNegotiation
     )
     def download_shopping_cart(self, request):
         user = request.user
         if not user.shopping_cart.exists():
             return Response(status=HTTPStatus.BAD_REQUEST)
-        ingredients = IngredientInRecipe.objects.filter(
-            recipe__shopping_cart__user=user
+        ingredients = ShoppingList.objects.filter(
+            user=user
         ).values(
-            'ingredients__name',
-            'ingredients__measurement_unit',
-        ).annotate(
-            value=Sum('amount')
-        ).order_by('ingredients__name')
-        return make_cart_txt(user, ingredients)
+            'ingredient__name',
+            'ingredient__measurement_unit',
+            'amount',
+        ).order_by('ingredient__name')
+        return make_cart_response(
+            ingredients, request.accepted_renderer.format
+        )
+
+
+class MetricsView(APIView):
+    permission_classes = (IsAdminUser,)
+
+    def get(self, request):
+        return HttpResponse(
+            render_metrics(), content_type=METRICS_CONTENT_TYPE
+        )
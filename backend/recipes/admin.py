@@ -1,27 +1,43 @@
+from collections import Counter, defaultdict
+
 from django.contrib import admin
 
+from api.services import (RECIPE_COUNTERS, change_recipe_counter,
+                          get_recipe_amounts, update_recipe_shopping_lists)
+
 from .models import (
     Ingredient,
     Tag,
     Recipe,
     IngredientInRecipe,
     Favorite,
-    Cart
+    Cart,
+    ShoppingList
 )
+from .paginators import EstimatedCountPaginator
+from .search import search_recipes, update_search_index
 
 
 class IngredientRecipeInline(admin.TabularInline):
 
     model = IngredientInRecipe
     extra = 0
+    autocomplete_fields = ('ingredients',)
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related(
+            'recipe', 'ingredients'
+        )
 
 
 @admin.register(Ingredient)
 class IngredientAdmin(admin.ModelAdmin):
     list_display = ('id', 'name', 'measurement_unit')
-    search_fields = ('name',)
+    search_fields = ('^name',)
     empty_value_display = '-пусто-'
-    list_filter = ('name',)
+    list_filter = ('measurement_unit',)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
 
 @admin.register(Tag)
@@ -42,31 +58,91 @@ class RecipeAdmin(admin.ModelAdmin):
         'name',
         'author',
         'cooking_time',
-        'id',
-        'favorite_count',
+        'favorites_count',
+        'carts_count',
         'pub_date'
     )
-    search_fields = (
-        'name',
-        'cooking_time',
-        'author__username',
-        'ingredients__name'
-    )
+    list_select_related = ('author',)
+    search_fields = ('name',)
     empty_value_display = '-пусто-'
-    list_filter = ('name', 'author', 'tags')
-
-    @admin.display(description='Количество избранных рецептов')
-    def favorite_count(self, obj):
-        return obj.favorite.count()
+    list_filter = ('tags', 'pub_date')
+    autocomplete_fields = ('author', 'tags', 'ingredients')
+    readonly_fields = (
+        'image_thumbnail', 'image_card', 'favorites_count', 'carts_count'
+    )
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term:
+            return queryset, False
+        return search_recipes(queryset, search_term), False
+
+    def save_related(self, request, form, formsets, change):
+        amounts = get_recipe_amounts(form.instance, -1) if change else {}
+        super().save_related(request, form, formsets, change)
+        update_recipe_shopping_lists(form.instance, amounts)
+        update_search_index([form.instance.pk])
+
+
+class RecipeCounterAdmin(admin.ModelAdmin):
+
+    def get_readonly_fields(self, request, obj=None):
+        if obj is None:
+            return ()
+        return ('user', 'recipe')
+
+    def change_counters(self, recipe_ids, delta):
+        recipes = defaultdict(list)
+        for recipe, count in Counter(recipe_ids).items():
+            recipes[count].append(recipe)
+        for count, pks in recipes.items():
+            change_recipe_counter(
+                Recipe.objects.filter(pk__in=pks),
+                RECIPE_COUNTERS[self.model],
+                delta * count
+            )
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        if not change:
+            self.change_counters([obj.recipe_id], 1)
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        self.change_counters([obj.recipe_id], -1)
+
+    def delete_queryset(self, request, queryset):
+        recipe_ids = list(queryset.values_list('recipe', flat=True))
+        super().delete_queryset(request, queryset)
+        self.change_counters(recipe_ids, -1)
 
 
 @admin.register(Favorite)
-class FavoriteAdmin(admin.ModelAdmin):
-    list_display = ('id', 'user')
+class FavoriteAdmin(RecipeCounterAdmin):
+    list_display = ('id', 'user', 'recipe')
+    list_select_related = ('user', 'recipe')
+    autocomplete_fields = ('user', 'recipe')
     empty_value_display = '-пусто-'
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
 
 @admin.register(Cart)
-class ShoppingCartAdmin(admin.ModelAdmin):
-    list_display = ('id', 'user')
+class ShoppingCartAdmin(RecipeCounterAdmin):
+    list_display = ('id', 'user', 'recipe')
+    list_select_related = ('user', 'recipe')
+    autocomplete_fields = ('user', 'recipe')
+    empty_value_display = '-пусто-'
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+
+@admin.register(ShoppingList)
+class ShoppingListAdmin(admin.ModelAdmin):
+    list_display = ('id', 'user', 'ingredient', 'amount')
+    list_select_related = ('user', 'ingredient')
+    autocomplete_fields = ('user', 'ingredient')
     empty_value_display = '-пусто-'
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
@@ -0,0 +1,286 @@
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from itertools import accumulate, islice
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.management import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Count, Max
+
+from api.services import (
+    fill_timelines,
+    get_recipe_counters,
+    iter_live_shopping_lists
+)
+from api.surrogates import RECIPE_LIST, purge
+from api.versions import INGREDIENTS, TAGS, bump_version
+from recipes.models import (
+    Cart,
+    Favorite,
+    Ingredient,
+    IngredientInRecipe,
+    Recipe,
+    ShoppingList,
+    Tag
+)
+from recipes.search import update_search_index
+from users.models import Follow, User
+
+START_DATE = datetime(2022, 1, 1, tzinfo=timezone.utc)
+PERIOD = int(timedelta(days=365).total_seconds())
+TAGS_DATA = (
+    ('завтрак', '#e26c2d', 'breakfast'),
+    ('обед', '#49b64e', 'lunch'),
+    ('ужин', '#8775d2', 'dinner'),
+    ('суп', '#fff68f', 'soup'),
+    ('салат', '#a0db8e', 'salat'),
+)
+
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def power_law_weights(size, alpha):
+    return list(accumulate(1 / (rank + 1) ** alpha for rank in range(size)))
+
+
+class Command(BaseCommand):
+    help = 'Generates a synthetic dataset'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--recipes', type=int, default=10000)
+        parser.add_argument(
+            '--ingredients-per-recipe', type=int, default=8,
+            help='Среднее количество ингредиентов в рецепте',
+        )
+        parser.add_argument(
+            '--follows', type=int, default=20,
+            help='Среднее количество подписок пользователя',
+        )
+        parser.add_argument(
+            '--favorites', type=int, default=20,
+            help='Среднее количество избранных рецептов пользователя',
+        )
+        parser.add_argument(
+            '--cart', type=int, default=10,
+            help='Среднее количество рецептов в корзине пользователя',
+        )
+        parser.add_argument(
+            '--alpha', type=float, default=1.1,
+            help='Показатель степенного распределения популярности',
+        )
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def log(self, message):
+        self.stdout.write(
+            f'[{time.monotonic() - self.started:.1f} с] {message}'
+        )
+
+    def bulk_create(self, model, objects, **kwargs):
+        created = 0
+        for batch in batched(objects, self.batch_size):
+            model.objects.bulk_create(batch, **kwargs)
+            created += len(batch)
+        self.log(f'{model._meta.verbose_name_plural}: {created}')
+
+    def new_ids(self, model, before):
+        return list(
+            model.objects.filter(pk__gt=before or 0).order_by(
+                'pk'
+            ).values_list('pk', flat=True)
+        )
+
+    def draw_count(self, mean):
+        return min(int(self.random.expovariate(1 / mean)), mean * 20)
+
+    def popular(self, population, weights, count, exclude=None):
+        chosen = set(
+            self.random.choices(population, cum_weights=weights, k=count)
+        )
+        chosen.discard(exclude)
+        return sorted(chosen)
+
+    def make_ingredients(self):
+        if not Ingredient.objects.exists():
+            self.bulk_create(
+                Ingredient,
+                (
+                    Ingredient(name=f'ингредиент {i}', measurement_unit='г')
+                    for i in range(2000)
+                ),
+            )
+            bump_version(INGREDIENTS)
+        return list(Ingredient.objects.values_list('pk', flat=True))
+
+    def make_tags(self):
+        if not Tag.objects.exists():
+            self.bulk_create(
+                Tag,
+                (
+                    Tag(name=name, color=color, slug=slug)
+                    for name, color, slug in TAGS_DATA
+                ),
+            )
+            bump_version(TAGS)
+        return list(Tag.objects.values_list('pk', flat=True))
+
+    def make_users(self, count, seed):
+        before = User.objects.aggregate(Max('pk'))['pk__max']
+        password = make_password('benchmark-password')
+        self.bulk_create(
+            User,
+            (
+                User(
+                    username=f'bench_{seed}_{i}',
+                    email=f'bench_{seed}_{i}@example.com',
+                    first_name=f'Пользователь {i}',
+                    last_name='Тестовый',
+                    password=password,
+                )
+                for i in range(count)
+            ),
+        )
+        return self.new_ids(User, before)
+
+    def make_recipes(self, count, users, weights):
+        before = Recipe.objects.aggregate(Max('pk'))['pk__max']
+        pub_date = Recipe._meta.get_field('pub_date')
+        pub_date.auto_now_add = False
+        try:
+            self.bulk_create(
+                Recipe,
+                (
+                    Recipe(
+                        author_id=self.random.choices(
+                            users, cum_weights=weights
+                        )[0],
+                        name=f'Рецепт {i}',
+                        text=f'Описание рецепта {i}',
+                        cooking_time=self.random.randint(5, 180),
+                        image='recipes/benchmark.png',
+                        pub_date=START_DATE + timedelta(
+                            seconds=self.random.randrange(PERIOD)
+                        ),
+                    )
+                    for i in range(count)
+                ),
+            )
+        finally:
+            pub_date.auto_now_add = True
+        return self.new_ids(Recipe, before)
+
+    def make_recipe_relations(self, recipes, ingredients, tags, mean):
+        self.bulk_create(
+            IngredientInRecipe,
+            (
+                IngredientInRecipe(
+                    recipe_id=recipe,
+                    ingredients_id=ingredient,
+                    amount=self.random.randint(1, 500),
+                )
+                for recipe in recipes
+                for ingredient in self.random.sample(
+                    ingredients,
+                    min(max(self.draw_count(mean), 1), len(ingredients)),
+                )
+            ),
+        )
+        self.bulk_create(
+            Recipe.tags.through,
+            (
+                Recipe.tags.through(recipe_id=recipe, tag_id=tag)
+                for recipe in recipes
+                for tag in self.random.sample(
+                    tags, self.random.randint(1, min(3, len(tags)))
+                )
+            ),
+        )
+
+    def make_user_relations(self, model, users, targets, weights, mean,
+                            field):
+        self_related = targets is users
+        self.bulk_create(
+            model,
+            (
+                model(user_id=user, **{field: target})
+                for user in users
+                for target in self.popular(
+                    targets, weights, self.draw_count(mean),
+                    exclude=user if self_related else None
+                )
+            ),
+            ignore_conflicts=True,
+        )
+
+    def handle(self, *args, **options):
+        for option in ('users', 'recipes', 'batch_size'):
+            if options[option] < 1:
+                raise CommandError(f'--{option} должно быть больше 0')
+        self.started = time.monotonic()
+        self.random = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        alpha = options['alpha']
+        with transaction.atomic():
+            ingredients = self.make_ingredients()
+            tags = self.make_tags()
+            users = self.make_users(options['users'], options['seed'])
+            user_weights = power_law_weights(len(users), alpha)
+            recipes = self.make_recipes(
+                options['recipes'], users, user_weights
+            )
+            recipe_weights = power_law_weights(len(recipes), alpha)
+            self.make_recipe_relations(
+                recipes, ingredients, tags, options['ingredients_per_recipe']
+            )
+            self.make_user_relations(
+                Follow, users, users, user_weights,
+                options['follows'], 'author_id',
+            )
+            User.objects.filter(pk__gte=users[0]).annotate(
+                followers_count=Count('following')
+            ).filter(
+                followers_count__gt=settings.FEED_FAN_OUT_LIMIT
+            ).update(feed_fan_in=True)
+            fill_timelines(Follow.objects.filter(user__gte=users[0]))
+            self.log('Ленты подписок заполнены')
+            self.make_user_relations(
+                Favorite, users, recipes, recipe_weights,
+                options['favorites'], 'recipe_id',
+            )
+            self.make_user_relations(
+                Cart, users, recipes, recipe_weights,
+                options['cart'], 'recipe_id',
+            )
+            Recipe.objects.filter(pk__gte=recipes[0]).update(
+                **get_recipe_counters()
+            )
+            self.log('Счётчики популярности пересчитаны')
+            ShoppingList.objects.filter(user__gte=users[0]).delete()
+            self.bulk_create(
+                ShoppingList,
+                (
+                    ShoppingList(
+                        user_id=user, ingredient_id=ingredient, amount=amount
+                    )
+                    for user, ingredient, amount in iter_live_shopping_lists(
+                        recipe__shopping_cart__user__gte=users[0]
+                    )
+                ),
+            )
+            for batch in batched(recipes, self.batch_size):
+                update_search_index(batch)
+            self.log('Поисковый индекс обновлён')
+            purge(RECIPE_LIST)
+        self.stdout.write(self.style.SUCCESS(
+            f'Данные сгенерированы за {time.monotonic() - self.started:.1f} с'
+        ))
@@ -0,0 +1,21 @@
+from django.core.management import BaseCommand
+from django.db.models import Q
+
+from api.images import make_renditions
+from recipes.models import Recipe
+
+
+class Command(BaseCommand):
+    help = 'Makes recipe image renditions'
+
+    def handle(self, *args, **options):
+        recipes = Recipe.objects.exclude(image='').filter(
+            Q(image_thumbnail='') | Q(image_card='')
+        ).values_list('id', flat=True)
+        made = 0
+        for recipe_id in recipes.iterator():
+            make_renditions(recipe_id)
+            made += 1
+        self.stdout.write(
+            self.style.SUCCESS(f'Изображения подготовлены: {made}')
+        )
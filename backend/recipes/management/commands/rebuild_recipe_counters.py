@@ -0,0 +1,56 @@
+from django.core.management import BaseCommand
+from django.db.models import F
+
+from api.services import get_recipe_counters
+from recipes.models import Recipe
+
+BATCH_SIZE = 1000
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds and verifies recipe popularity counters'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Только проверить счётчики, не исправляя их',
+        )
+
+    def get_mismatches(self):
+        counters = get_recipe_counters()
+        return list(
+            Recipe.objects.annotate(
+                **{f'live_{field}': value for field, value in counters.items()}
+            ).exclude(
+                **{field: F(f'live_{field}') for field in counters}
+            ).values_list(
+                'pk', *counters, *(f'live_{field}' for field in counters)
+            ).order_by('pk')
+        )
+
+    def handle(self, *args, **options):
+        mismatches = self.get_mismatches()
+        for pk, favorites, carts, live_favorites, live_carts in mismatches:
+            self.stdout.write(
+                f'Рецепт {pk}: в избранном {favorites} вместо '
+                f'{live_favorites}, в корзинах {carts} вместо {live_carts}'
+            )
+        if options['check']:
+            if mismatches:
+                self.stdout.write(self.style.ERROR(
+                    f'Расхождений: {len(mismatches)}'
+                ))
+            else:
+                self.stdout.write(self.style.SUCCESS(
+                    'Счётчики совпадают с избранным и корзинами'
+                ))
+            return
+        ids = [pk for pk, *_ in mismatches]
+        for start in range(0, len(ids), BATCH_SIZE):
+            Recipe.objects.filter(
+                pk__in=ids[start:start + BATCH_SIZE]
+            ).update(**get_recipe_counters())
+        self.stdout.write(self.style.SUCCESS(
+            f'Счётчики исправлены: {len(ids)}'
+        ))
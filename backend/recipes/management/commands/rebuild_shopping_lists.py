@@ -0,0 +1,69 @@
+from django.core.management import BaseCommand
+from django.db import transaction
+
+from api.services import get_live_shopping_lists
+from recipes.models import ShoppingList
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds and verifies shopping lists'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Только проверить списки покупок, не перестраивая их',
+        )
+
+    def get_mismatches(self):
+        live = get_live_shopping_lists()
+        stored = {
+            (user, ingredient): amount
+            for user, ingredient, amount in ShoppingList.objects.values_list(
+                'user', 'ingredient', 'amount'
+            )
+        }
+        return {
+            key: (stored.get(key), live.get(key))
+            for key in live.keys() | stored.keys()
+            if stored.get(key) != live.get(key)
+        }
+
+    @transaction.atomic
+    def rebuild(self):
+        ShoppingList.objects.all().delete()
+        ShoppingList.objects.bulk_create(
+            (
+                ShoppingList(user_id=user, ingredient_id=ingredient,
+                             amount=amount)
+                for (user, ingredient), amount
+                in get_live_shopping_lists().items()
+            ),
+            batch_size=1000,
+        )
+
+    def handle(self, *args, **options):
+        mismatches = self.get_mismatches()
+        for (user, ingredient), (stored, live) in sorted(mismatches.items()):
+            self.stdout.write(
+                f'Пользователь {user}, ингредиент {ingredient}: '
+                f'в списке {stored}, в корзине {live}'
+            )
+        if options['check']:
+            if mismatches:
+                self.stdout.write(self.style.ERROR(
+                    f'Расхождений: {len(mismatches)}'
+                ))
+            else:
+                self.stdout.write(self.style.SUCCESS(
+                    'Списки покупок совпадают с корзинами'
+                ))
+            return
+        self.rebuild()
+        mismatches = self.get_mismatches()
+        if mismatches:
+            self.stdout.write(self.style.ERROR(
+                f'После перестроения осталось расхождений: {len(mismatches)}'
+            ))
+            return
+        self.stdout.write(self.style.SUCCESS('Списки покупок перестроены'))
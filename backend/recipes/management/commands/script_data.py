@@ -1,25 +1,174 @@
 import csv
+import io
+import json
+import time
+from itertools import islice
 
-# from django.conf import settings
-from foodgram.settings import BASE_DIR
-from django.core.management import BaseCommand
+from django.core.management import BaseCommand, CommandError
+from django.db import connection, transaction
 
+from api.versions import INGREDIENTS, bump_version
+from foodgram.settings import BASE_DIR
 from recipes.models import Ingredient
 
+READ_SIZE = 64 * 1024
+NAME_LENGTH = Ingredient._meta.get_field('name').max_length
+UNIT_LENGTH = Ingredient._meta.get_field('measurement_unit').max_length
+
+
+def read_csv(file):
+    for row in csv.reader(file):
+        if len(row) == 2:
+            yield row
+
+
+def read_json(file):
+    decoder = json.JSONDecoder()
+    buffer = ''
+    position = 0
+    finished = False
+    while True:
+        while position < len(buffer) and buffer[position] in ' \t\r\n[,':
+            position += 1
+        if position < len(buffer) and buffer[position] == ']':
+            return
+        try:
+            item, position = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError:
+            if finished:
+                if buffer[position:].strip():
+                    raise
+                return
+            chunk = file.read(READ_SIZE)
+            finished = not chunk
+            buffer = buffer[position:] + chunk
+            position = 0
+            continue
+        yield item['name'], item['measurement_unit']
+
+
+READERS = {
+    'csv': read_csv,
+    'json': read_json,
+}
+
 
 class Command(BaseCommand):
     help = 'Loads ingredients'
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path',
+            default=f'{BASE_DIR}/data/ingredients.csv',
+            help='Путь к файлу с ингредиентами (csv или json)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Количество ингредиентов в одной вставке',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Прочитать файл без записи в базу данных',
+        )
+
+    def read_rows(self, file, reader):
+        seen = set()
+        for name, measurement_unit in reader(file):
+            row = (name.strip(), measurement_unit.strip())
+            if (
+                not all(row) or row in seen
+                or len(row[0]) > NAME_LENGTH
+                or len(row[1]) > UNIT_LENGTH
+            ):
+                self.skipped += 1
+                continue
+            seen.add(row)
+            yield row
+
+    @staticmethod
+    def count_existing(batch):
+        existing = set(
+            Ingredient.objects.filter(
+                name__in={name for name, _ in batch}
+            ).values_list('name', 'measurement_unit')
+        )
+        return sum(row in existing for row in batch)
+
+    @staticmethod
+    def copy_batch(batch):
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(batch)
+        buffer.seek(0)
+        table = Ingredient._meta.db_table
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'CREATE TEMP TABLE IF NOT EXISTS ingredient_load '
+                f'(name varchar({NAME_LENGTH}), '
+                f'measurement_unit varchar({UNIT_LENGTH})) '
+                f'ON COMMIT DELETE ROWS'
+            )
+            cursor.cursor.copy_expert(
+                'COPY ingredient_load FROM STDIN WITH (FORMAT csv)', buffer
+            )
+            cursor.execute(
+                f'INSERT INTO {table} (name, measurement_unit) '
+                f'SELECT name, measurement_unit FROM ingredient_load '
+                f'ON CONFLICT DO NOTHING'
+            )
+
+    @staticmethod
+    def insert_batch(batch):
+        Ingredient.objects.bulk_create(
+            (
+                Ingredient(name=name, measurement_unit=measurement_unit)
+                for name, measurement_unit in batch
+            ),
+            ignore_conflicts=True,
+        )
+
     def handle(self, *args, **options):
-        with open(
-            f'{BASE_DIR}/data/ingredients.csv',
-            'r',
-            encoding='utf-8'
-        ) as file:
-            file_reader = csv.reader(file)
-            for row in file_reader:
-                name, measurement_unit = row
-                Ingredient.objects.get_or_create(
-                    name=name,
-                    measurement_unit=measurement_unit)
-        self.stdout.write(self.style.SUCCESS('Ингредиенты загружены'))
+        path = options['path']
+        batch_size = options['batch_size']
+        reader = READERS.get(path.rsplit('.', 1)[-1].lower())
+        if reader is None:
+            raise CommandError('Поддерживаются только файлы csv и json')
+        if batch_size < 1:
+            raise CommandError('Размер пачки должен быть больше 0')
+        load_batch = (
+            self.copy_batch if connection.vendor == 'postgresql'
+            else self.insert_batch
+        )
+        self.skipped = 0
+        read = existing = 0
+        started = time.monotonic()
+        before = Ingredient.objects.count()
+        with open(path, 'r', encoding='utf-8') as file:
+            rows = self.read_rows(file, reader)
+            while True:
+                batch = list(islice(rows, batch_size))
+                if not batch:
+                    break
+                read += len(batch)
+                if options['dry_run']:
+                    existing += self.count_existing(batch)
+                else:
+                    with transaction.atomic():
+                        load_batch(batch)
+                self.stdout.write(
+                    f'Обработано {read} ингредиентов '
+                    f'за {time.monotonic() - started:.2f} с'
+                )
+        if options['dry_run']:
+            created = read - existing
+        else:
+            created = Ingredient.objects.count() - before
+            if created:
+                bump_version(INGREDIENTS)
+        self.stdout.write(self.style.SUCCESS(
+            f'Ингредиенты загружены: прочитано {read}, добавлено {created}, '
+            f'пропущено {self.skipped}, '
+            f'время {time.monotonic() - started:.2f} с'
+        ))
@@ -0,0 +1,31 @@
+# Generated by Django 3.2.6 on 2026-10-18 11:00
+
+from django.db import migrations
+
+INDEX_NAME = 'recipes_ingredient_upper_name_idx'
+
+
+def create_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(
+        f'CREATE INDEX IF NOT EXISTS {INDEX_NAME} '
+        f'ON recipes_ingredient (UPPER(name::text) text_pattern_ops)'
+    )
+
+
+def drop_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(f'DROP INDEX IF EXISTS {INDEX_NAME}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0005_shoppinglist'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
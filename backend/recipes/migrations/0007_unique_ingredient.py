@@ -0,0 +1,78 @@
+# Generated by Django 3.2.6 on 2026-10-18 12:00
+
+from django.db import migrations, models
+
+
+def merge_rows(model, field, owner, duplicates):
+    for row in list(model.objects.filter(**{f'{field}__in': duplicates})):
+        keeper = duplicates[getattr(row, f'{field}_id')]
+        existing = model.objects.filter(
+            **{owner: getattr(row, f'{owner}_id'), field: keeper}
+        ).first()
+        if existing is None:
+            setattr(row, f'{field}_id', keeper)
+            row.save(update_fields=[field])
+            continue
+        existing.amount += row.amount
+        existing.save(update_fields=['amount'])
+        row.delete()
+
+
+def merge_duplicate_ingredients(apps, schema_editor):
+    Ingredient = apps.get_model('recipes', 'Ingredient')
+    IngredientInRecipe = apps.get_model('recipes', 'IngredientInRecipe')
+    ShoppingList = apps.get_model('recipes', 'ShoppingList')
+    RecipeIngredient = apps.get_model('recipes', 'Recipe').ingredients.through
+    keepers = {}
+    duplicates = {}
+    renamed = []
+    for pk, name, measurement_unit in Ingredient.objects.order_by(
+        'pk'
+    ).values_list('pk', 'name', 'measurement_unit').iterator():
+        row = (name.strip(), measurement_unit.strip())
+        if row in keepers:
+            duplicates[pk] = keepers[row]
+            continue
+        keepers[row] = pk
+        if row != (name, measurement_unit):
+            renamed.append((pk, row))
+    if duplicates:
+        merge_rows(IngredientInRecipe, 'ingredients', 'recipe', duplicates)
+        merge_rows(ShoppingList, 'ingredient', 'user', duplicates)
+        links = RecipeIngredient.objects.filter(ingredient__in=duplicates)
+        RecipeIngredient.objects.bulk_create(
+            (
+                RecipeIngredient(
+                    recipe_id=recipe, ingredient_id=duplicates[ingredient]
+                )
+                for recipe, ingredient in links.values_list(
+                    'recipe', 'ingredient'
+                )
+            ),
+            ignore_conflicts=True,
+        )
+        links.delete()
+        Ingredient.objects.filter(pk__in=duplicates).delete()
+    for pk, (name, measurement_unit) in renamed:
+        Ingredient.objects.filter(pk=pk).update(
+            name=name, measurement_unit=measurement_unit
+        )
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute('SET CONSTRAINTS ALL IMMEDIATE')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0006_ingredient_upper_name_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            merge_duplicate_ingredients, migrations.RunPython.noop
+        ),
+        migrations.AddConstraint(
+            model_name='ingredient',
+            constraint=models.UniqueConstraint(fields=('name', 'measurement_unit'), name='unique_ingredient'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 3.2.6 on 2026-10-18 05:39
+
+from django.db import migrations, models
+import recipes.storage
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0007_unique_ingredient'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='image_card',
+            field=models.ImageField(blank=True, help_text='Создаётся автоматически из изображения рецепта', storage=recipes.storage.DeduplicatingStorage(), upload_to='recipes/renditions/', verbose_name='Изображение для карточки'),
+        ),
+        migrations.AddField(
+            model_name='recipe',
+            name='image_thumbnail',
+            field=models.ImageField(blank=True, help_text='Создаётся автоматически из изображения рецепта', storage=recipes.storage.DeduplicatingStorage(), upload_to='recipes/renditions/', verbose_name='Миниатюра'),
+        ),
+        migrations.AlterField(
+            model_name='recipe',
+            name='image',
+            field=models.ImageField(help_text='Выберите изображение рецепта', storage=recipes.storage.DeduplicatingStorage(), upload_to='recipes/', verbose_name='Изображение'),
+        ),
+    ]
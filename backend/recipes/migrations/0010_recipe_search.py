@@ -0,0 +1,73 @@
+# Generated by Django 3.2.6 on 2026-10-18 14:00
+
+from django.db import migrations
+
+POSTGRES_CREATE = (
+    'ALTER TABLE recipes_recipe '
+    'ADD COLUMN IF NOT EXISTS search_vector tsvector',
+    'CREATE INDEX IF NOT EXISTS recipes_recipe_search_vector_idx '
+    'ON recipes_recipe USING gin (search_vector)',
+    '''
+    UPDATE recipes_recipe SET search_vector =
+        setweight(to_tsvector('russian', name), 'A')
+        || setweight(to_tsvector('russian', coalesce((
+            SELECT string_agg(ingredient.name, ' ')
+            FROM recipes_ingredientinrecipe AS amount
+            JOIN recipes_ingredient AS ingredient
+                ON ingredient.id = amount.ingredients_id
+            WHERE amount.recipe_id = recipes_recipe.id
+        ), '')), 'B')
+        || setweight(to_tsvector('russian', text), 'C')
+    ''',
+)
+POSTGRES_DROP = (
+    'ALTER TABLE recipes_recipe DROP COLUMN IF EXISTS search_vector',
+)
+SQLITE_CREATE = (
+    'CREATE VIRTUAL TABLE IF NOT EXISTS recipes_recipe_search '
+    'USING fts5(name, ingredients, text, tokenize=unicode61)',
+    '''
+    INSERT INTO recipes_recipe_search (rowid, name, ingredients, text)
+    SELECT recipe.id, recipe.name, coalesce((
+        SELECT group_concat(ingredient.name, ' ')
+        FROM recipes_ingredientinrecipe AS amount
+        JOIN recipes_ingredient AS ingredient
+            ON ingredient.id = amount.ingredients_id
+        WHERE amount.recipe_id = recipe.id
+    ), ''), recipe.text
+    FROM recipes_recipe AS recipe
+    ''',
+)
+SQLITE_DROP = (
+    'DROP TABLE IF EXISTS recipes_recipe_search',
+)
+
+
+def run_statements(schema_editor, statements):
+    for statement in statements.get(schema_editor.connection.vendor, ()):
+        schema_editor.execute(statement)
+
+
+def create_index(apps, schema_editor):
+    run_statements(schema_editor, {
+        'postgresql': POSTGRES_CREATE,
+        'sqlite': SQLITE_CREATE,
+    })
+
+
+def drop_index(apps, schema_editor):
+    run_statements(schema_editor, {
+        'postgresql': POSTGRES_DROP,
+        'sqlite': SQLITE_DROP,
+    })
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0009_recipe_pub_date_id_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 3.2.6 on 2026-10-18 19:00
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+import django.utils.timezone
+
+
+def fill_pub_dates(apps, schema_editor):
+    Recipe = apps.get_model('recipes', 'Recipe')
+    Timeline = apps.get_model('recipes', 'Timeline')
+    Timeline.objects.update(
+        pub_date=Subquery(
+            Recipe.objects.filter(pk=OuterRef('recipe')).values('pub_date')
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0014_ingredientinrecipe_ordering'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='timeline',
+            name='pub_date',
+            field=models.DateTimeField(default=django.utils.timezone.now, help_text='Дата публикации рецепта', verbose_name='Дата публикации'),
+            preserve_default=False,
+        ),
+        migrations.RunPython(fill_pub_dates, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='timeline',
+            index=models.Index(fields=['user', '-pub_date', '-recipe'], name='timeline_user_pub_date_idx'),
+        ),
+    ]
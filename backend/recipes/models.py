@@ -1,6 +1,7 @@
 from django.core.validators import MinValueValidator
 from django.db import models
 
+from .storage import DeduplicatingStorage
 from users.models import User
 
 
@@ -22,6 +23,12 @@ class Ingredient(models.Model):
         verbose_name = 'Ингредиент'
         verbose_name_plural = 'Ингредиенты'
         ordering = ('name',)
+        constraints = [
+            models.UniqueConstraint(
+                fields=['name', 'measurement_unit'],
+                name='unique_ingredient'
+            )
+        ]
 
     def __str__(self):
         return self.name
@@ -74,8 +81,23 @@ class Recipe(models.Model):
     image = models.ImageField(
         verbose_name='Изображение',
         upload_to='recipes/',
+        storage=DeduplicatingStorage(),
         help_text='Выберите изображение рецепта'
     )
+    image_thumbnail = models.ImageField(
+        verbose_name='Миниатюра',
+        upload_to='recipes/renditions/',
+        storage=DeduplicatingStorage(),
+        blank=True,
+        help_text='Создаётся автоматически из изображения рецепта'
+    )
+    image_card = models.ImageField(
+        verbose_name='Изображение для карточки',
+        upload_to='recipes/renditions/',
+        storage=DeduplicatingStorage(),
+        blank=True,
+        help_text='Создаётся автоматически из изображения рецепта'
+    )
     text = models.TextField(
         verbose_name='Описание рецепта',
         help_text='Введите описания рецепта'
@@ -104,12 +126,36 @@ class Recipe(models.Model):
         verbose_name='Дата публикации',
         help_text='Добавить дату публикации'
     )
+    favorites_count = models.IntegerField(
+        default=0,
+        verbose_name='В избранном',
+        help_text='Количество пользователей, добавивших рецепт в избранное'
+    )
+    carts_count = models.IntegerField(
+        default=0,
+        verbose_name='В корзинах',
+        help_text='Количество пользователей, добавивших рецепт в корзину'
+    )
 
     class Meta:
 
         ordering = ('-pub_date',)
         verbose_name = 'Рецепт'
         verbose_name_plural = 'Рецепты'
+        indexes = [
+            models.Index(
+                fields=['-pub_date', '-id'],
+                name='recipe_pub_date_id_idx'
+            ),
+            models.Index(
+                fields=['-favorites_count', '-id'],
+                name='recipe_favorites_count_idx'
+            ),
+            models.Index(
+                fields=['author', '-pub_date', '-id'],
+                name='recipe_author_pub_date_idx'
+            )
+        ]
 
     def __str__(self):
         return self.name
@@ -138,6 +184,7 @@ class IngredientInRecipe(models.Model):
 
     class Meta:
 
+        ordering = ('id',)
         verbose_name = 'Ингредиент в рецепте'
         verbose_name_plural = 'Ингредиенты в рецепте'
         constraints = [
@@ -146,6 +193,12 @@ class IngredientInRecipe(models.Model):
                 name='unique_ingredientinrecipe'
             )
         ]
+        indexes = [
+            models.Index(
+                fields=['recipe', 'ingredients', 'amount'],
+                name='ingredientinrecipe_recipe_idx'
+            )
+        ]
 
     def __str__(self):
         return f'{self.ingredients} в {self.recipe}'
@@ -213,3 +266,81 @@ class Cart(models.Model):
 
     def __str__(self):
         return f'У пользователя {self.user} в корзине рецепт - {self.recipe}'
+
+
+class ShoppingList(models.Model):
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='shopping_list',
+        verbose_name='Пользователь',
+        help_text='Выберите пользователя'
+    )
+    ingredient = models.ForeignKey(
+        Ingredient,
+        on_delete=models.CASCADE,
+        related_name='shopping_list',
+        verbose_name='Ингредиент',
+        help_text='Выберите ингредиент'
+    )
+    amount = models.FloatField(
+        verbose_name='Количество',
+        help_text='Суммарное количество ингредиента в корзине'
+    )
+
+    class Meta:
+
+        verbose_name = 'Список покупок'
+        verbose_name_plural = 'Списки покупок'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'ingredient'],
+                name='unique_shoppinglist'
+            )
+        ]
+
+    def __str__(self):
+        return f'{self.ingredient} в списке покупок {self.user}'
+
+
+class Timeline(models.Model):
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='timeline',
+        verbose_name='Подписчик',
+        help_text='Выберите подписчика'
+    )
+    recipe = models.ForeignKey(
+        Recipe,
+        on_delete=models.CASCADE,
+        related_name='timeline',
+        verbose_name='Рецепт',
+        help_text='Выберите рецепт'
+    )
+    pub_date = models.DateTimeField(
+        verbose_name='Дата публикации',
+        help_text='Дата публикации рецепта'
+    )
+
+    class Meta:
+
+        verbose_name = 'Запись ленты'
+        verbose_name_plural = 'Ленты подписок'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'recipe'],
+                name='unique_timeline'
+            )
+        ]
+        indexes = [
+            models.Index(
+                fields=['user', '-pub_date', '-recipe'],
+                name='timeline_user_pub_date_idx'
+            )
+        ]
+
+    def __str__(self):
+        return f'{self.recipe} в ленте {self.user}'
@@ -0,0 +1,129 @@
+import re
+
+from django.db import connection, connections
+from django.db.models import BooleanField, FloatField, Q
+from django.db.models.expressions import RawSQL
+
+from .models import IngredientInRecipe
+
+SEARCH_CONFIG = 'russian'
+SEARCH_TABLE = 'recipes_recipe_search'
+WORD = re.compile(r'\w+')
+
+POSTGRES_UPDATE = f'''
+    UPDATE recipes_recipe SET search_vector =
+        setweight(to_tsvector('{SEARCH_CONFIG}', name), 'A')
+        || setweight(to_tsvector('{SEARCH_CONFIG}', coalesce((
+            SELECT string_agg(ingredient.name, ' ')
+            FROM recipes_ingredientinrecipe AS amount
+            JOIN recipes_ingredient AS ingredient
+                ON ingredient.id = amount.ingredients_id
+            WHERE amount.recipe_id = recipes_recipe.id
+        ), '')), 'B')
+        || setweight(to_tsvector('{SEARCH_CONFIG}', text), 'C')
+    WHERE id = ANY(%s)
+'''
+SQLITE_DELETE = f'DELETE FROM {SEARCH_TABLE} WHERE rowid IN ({{}})'
+SQLITE_INSERT = f'''
+    INSERT INTO {SEARCH_TABLE} (rowid, name, ingredients, text)
+    SELECT recipe.id, recipe.name, coalesce((
+        SELECT group_concat(ingredient.name, ' ')
+        FROM recipes_ingredientinrecipe AS amount
+        JOIN recipes_ingredient AS ingredient
+            ON ingredient.id = amount.ingredients_id
+        WHERE amount.recipe_id = recipe.id
+    ), ''), recipe.text
+    FROM recipes_recipe AS recipe
+    WHERE recipe.id IN ({{}})
+'''
+
+
+def create_search_index(schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute(
+            'ALTER TABLE recipes_recipe '
+            'ADD COLUMN IF NOT EXISTS search_vector tsvector'
+        )
+        schema_editor.execute(
+            'CREATE INDEX IF NOT EXISTS recipes_recipe_search_vector_idx '
+            'ON recipes_recipe USING gin (search_vector)'
+        )
+        schema_editor.execute(
+            POSTGRES_UPDATE.replace('WHERE id = ANY(%s)', '')
+        )
+    elif vendor == 'sqlite':
+        schema_editor.execute(
+            f'CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} '
+            f'USING fts5(name, ingredients, text, tokenize=unicode61)'
+        )
+        schema_editor.execute(
+            SQLITE_INSERT.format('SELECT id FROM recipes_recipe')
+        )
+
+
+def drop_search_index(schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute(
+            'ALTER TABLE recipes_recipe DROP COLUMN IF EXISTS search_vector'
+        )
+    elif vendor == 'sqlite':
+        schema_editor.execute(f'DROP TABLE IF EXISTS {SEARCH_TABLE}')
+
+
+def update_search_index(recipe_ids):
+    recipe_ids = list(recipe_ids)
+    if not recipe_ids:
+        return
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute(POSTGRES_UPDATE, (recipe_ids,))
+        elif connection.vendor == 'sqlite':
+            placeholders = ', '.join(['%s'] * len(recipe_ids))
+            cursor.execute(SQLITE_DELETE.format(placeholders), recipe_ids)
+            cursor.execute(SQLITE_INSERT.format(placeholders), recipe_ids)
+
+
+def search_recipes(queryset, query):
+    words = WORD.findall(query)
+    if not words:
+        return queryset
+    table = queryset.model._meta.db_table
+    vendor = connections[queryset.db].vendor
+    if vendor == 'postgresql':
+        search_query = f"websearch_to_tsquery('{SEARCH_CONFIG}', %s)"
+        return queryset.filter(
+            RawSQL(
+                f'"{table}"."search_vector" @@ {search_query}',
+                (query,),
+                output_field=BooleanField(),
+            )
+        ).annotate(
+            rank=RawSQL(
+                f'ts_rank("{table}"."search_vector", {search_query})',
+                (query,),
+                output_field=FloatField(),
+            )
+        ).order_by('-rank', '-pub_date')
+    if vendor == 'sqlite':
+        match = ' '.join(f'"{word}"*' for word in words)
+        return queryset.extra(
+            select={'rank': f'-bm25({SEARCH_TABLE}, 10.0, 5.0, 1.0)'},
+            tables=[SEARCH_TABLE],
+            where=[
+                f'{SEARCH_TABLE}.rowid = "{table}"."id"',
+                f'{SEARCH_TABLE} MATCH %s',
+            ],
+            params=[match],
+        ).order_by('-rank', '-pub_date')
+    condition = Q()
+    for word in words:
+        condition &= (
+            Q(name__icontains=word)
+            | Q(text__icontains=word)
+            | Q(pk__in=IngredientInRecipe.objects.filter(
+                ingredients__name__icontains=word
+            ).values('recipe'))
+        )
+    return queryset.filter(condition)
@@ -0,0 +1,29 @@
+import hashlib
+import os
+
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+
+
+class DeduplicatingStorage(FileSystemStorage):
+
+    def save(self, name, content, max_length=None):
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        if (
+            name is not None
+            and self.exists(name)
+            and self.is_content_name(name, content)
+        ):
+            return name
+        return super().save(name, content, max_length)
+
+    @staticmethod
+    def is_content_name(name, content):
+        stem = os.path.splitext(os.path.basename(name))[0]
+        if len(stem) != 64:
+            return False
+        digest = hashlib.sha256()
+        for chunk in content.chunks():
+            digest.update(chunk)
+        return digest.hexdigest() == stem
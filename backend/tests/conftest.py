@@ -0,0 +1,93 @@
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from api.services import add_recipes
+
+from recipes.models import (Cart, Favorite, Ingredient, IngredientInRecipe,
+                            Recipe, Tag)
+from recipes.search import create_search_index, update_search_index
+from users.models import Follow, User
+
+RECIPES = 30
+
+
+@pytest.fixture(scope='session')
+def django_db_setup(django_db_setup, django_db_blocker):
+    with django_db_blocker.unblock(), connection.schema_editor() as editor:
+        create_search_index(editor)
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def user(django_user_model):
+    return django_user_model.objects.create_user(
+        username='reader', email='reader@foodgram.ru', password='Reader1234!'
+    )
+
+
+@pytest.fixture
+def authors():
+    return [
+        User.objects.create_user(
+            username=f'author{number}',
+            email=f'author{number}@foodgram.ru',
+            password='Author1234!',
+        )
+        for number in range(3)
+    ]
+
+
+@pytest.fixture
+def recipes(user, authors):
+    tags = [
+        Tag.objects.create(name='Завтрак', color='#E26C2D', slug='breakfast'),
+        Tag.objects.create(name='Обед', color='#49B64E', slug='lunch'),
+    ]
+    ingredients = [
+        Ingredient.objects.create(name=f'ингредиент {number}',
+                                  measurement_unit='г')
+        for number in range(5)
+    ]
+    recipes = []
+    for number in range(RECIPES):
+        recipe = Recipe.objects.create(
+            author=authors[number % len(authors)],
+            name=f'Рецепт {number}',
+            text='Описание рецепта',
+            cooking_time=number + 1,
+            image='recipes/image.png',
+        )
+        recipe.tags.set(tags[:number % len(tags) + 1])
+        IngredientInRecipe.objects.bulk_create(
+            IngredientInRecipe(recipe=recipe, ingredients=ingredient,
+                               amount=amount)
+            for amount, ingredient in enumerate(ingredients, start=1)
+        )
+        recipes.append(recipe)
+    update_search_index([recipe.pk for recipe in recipes])
+    add_recipes(Favorite, user, [recipe.pk for recipe in recipes[::2]])
+    add_recipes(Cart, user, [recipe.pk for recipe in recipes[::3]])
+    Follow.objects.create(user=user, author=authors[0])
+    return recipes
+
+
+@pytest.fixture
+def anonymous_client():
+    return APIClient()
+
+
+@pytest.fixture
+def user_client(user):
+    token, _ = Token.objects.get_or_create(user=user)
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+    return client
@@ -0,0 +1,40 @@
+import pytest
+
+from recipes.models import Cart, Favorite, Recipe
+
+pytestmark = pytest.mark.django_db
+
+
+def assert_counters_match():
+    for recipe in Recipe.objects.all():
+        assert recipe.favorites_count == recipe.favorite.count()
+        assert recipe.carts_count == recipe.shopping_cart.count()
+
+
+@pytest.mark.parametrize('model', (Favorite, Cart))
+def test_admin_add_and_delete_keep_counters(admin_client, admin_user, user,
+                                            recipes, model):
+    url = f'/admin/recipes/{model._meta.model_name}/'
+    response = admin_client.post(
+        f'{url}add/', {'user': admin_user.pk, 'recipe': recipes[1].pk}
+    )
+    assert response.status_code == 302
+    assert_counters_match()
+    row = model.objects.get(user=admin_user)
+    response = admin_client.post(f'{url}{row.pk}/delete/', {'post': 'yes'})
+    assert response.status_code == 302
+    assert_counters_match()
+    admin_client.post(
+        f'{url}add/', {'user': admin_user.pk, 'recipe': recipes[0].pk}
+    )
+    response = admin_client.post(url, {
+        'action': 'delete_selected',
+        'post': 'yes',
+        '_selected_action': list(
+            model.objects.filter(recipe=recipes[0]).values_list(
+                'pk', flat=True
+            )
+        ),
+    })
+    assert response.status_code == 302
+    assert_counters_match()
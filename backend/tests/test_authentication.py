@@ -0,0 +1,30 @@
+import pytest
+from django.core.cache import cache
+from rest_framework.authtoken.models import Token
+
+from api.authentication import get_token_cache_key
+from users.models import User
+
+pytestmark = pytest.mark.django_db
+
+
+def test_deactivated_user_loses_cached_token(user, user_client):
+    assert user_client.get('/api/users/me/').status_code == 200
+    user.is_active = False
+    user.save()
+    assert user_client.get('/api/users/me/').status_code == 401
+
+
+def test_cached_token_of_inactive_user_rejected(user, user_client):
+    assert user_client.get('/api/users/me/').status_code == 200
+    User.objects.filter(pk=user.pk).update(is_active=False)
+    assert user_client.get('/api/users/me/').status_code == 401
+
+
+def test_cached_token_keeps_no_user_data(user, user_client):
+    assert user_client.get('/api/users/me/').status_code == 200
+    key = Token.objects.get(user=user).key
+    assert cache.get(get_token_cache_key(key)) == user.pk
+    User.objects.filter(pk=user.pk).update(first_name='Новое имя')
+    response = user_client.get('/api/users/me/')
+    assert response.json()['first_name'] == 'Новое имя'
@@ -0,0 +1,40 @@
+import pytest
+from django.core.cache import cache
+
+PATHS = {
+    'list': lambda recipes: ('/api/recipes/', {'limit': 10}),
+    'page': lambda recipes: ('/api/recipes/', {'limit': 5, 'page': 2}),
+    'detail': lambda recipes: (f'/api/recipes/{recipes[0].pk}/', {}),
+    'filtered': lambda recipes: (
+        '/api/recipes/',
+        {
+            'tags': ['breakfast', 'lunch'],
+            'author': recipes[0].author_id,
+            'is_favorited': 1,
+        },
+    ),
+    'cart': lambda recipes: ('/api/recipes/', {'is_in_shopping_cart': 1}),
+    'search': lambda recipes: ('/api/recipes/', {'search': 'рецепт'}),
+    'feed': lambda recipes: ('/api/recipes/feed/', {}),
+    'missing': lambda recipes: ('/api/recipes/0/', {}),
+}
+
+pytestmark = pytest.mark.django_db
+
+
+def fetch(settings, client, path, params, fast_path):
+    settings.RECIPE_FAST_PATH = fast_path
+    cache.clear()
+    response = client.get(path, params)
+    return response.status_code, response.content
+
+
+@pytest.mark.parametrize('client_name', ('anonymous_client', 'user_client'))
+@pytest.mark.parametrize('name', tuple(PATHS))
+def test_fast_path_matches_serializer(request, settings, recipes,
+                                      client_name, name):
+    client = request.getfixturevalue(client_name)
+    path, params = PATHS[name](recipes)
+    expected = fetch(settings, client, path, params, False)
+    assert expected[0] in (200, 401, 404)
+    assert fetch(settings, client, path, params, True) == expected
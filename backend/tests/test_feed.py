@@ -0,0 +1,81 @@
+import pytest
+
+from api.services import get_feed_positions
+
+from recipes.models import Recipe, Timeline
+from users.models import Follow
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def follows(user, authors, recipes):
+    Follow.objects.create(user=user, author=authors[1])
+    authors[1].feed_fan_in = True
+    authors[1].save()
+    Timeline.objects.filter(recipe__author=authors[1]).delete()
+    return Recipe.objects.filter(
+        author__in=authors[:2]
+    ).order_by('-pub_date', '-id')
+
+
+def get_pages(client, url, params=None):
+    pages = []
+    while url:
+        response = client.get(url, params)
+        assert response.status_code == 200
+        pages.append(response.json())
+        url, params = pages[-1]['next'], None
+    return pages
+
+
+@pytest.mark.parametrize('fast_path', (True, False))
+def test_feed_merges_timeline_and_fan_in(settings, user_client, follows,
+                                         fast_path):
+    settings.RECIPE_FAST_PATH = fast_path
+    pages = get_pages(user_client, '/api/recipes/feed/', {'limit': 4})
+    assert [
+        recipe['id'] for page in pages for recipe in page['results']
+    ] == list(follows.values_list('pk', flat=True))
+    assert pages[0]['previous'] is None
+    previous = user_client.get(pages[-1]['previous']).json()
+    assert previous['results'] == pages[-2]['results']
+    assert previous['next'] == pages[-2]['next']
+
+
+def test_feed_applies_filters(user_client, follows):
+    pages = get_pages(
+        user_client, '/api/recipes/feed/', {'limit': 3, 'tags': 'lunch'}
+    )
+    assert [
+        recipe['id'] for page in pages for recipe in page['results']
+    ] == list(
+        follows.filter(tags__slug='lunch').values_list('pk', flat=True)
+    )
+
+
+def test_feed_rejects_invalid_cursor(user_client, follows):
+    response = user_client.get('/api/recipes/feed/', {'cursor': 'cD14'})
+    assert response.status_code == 404
+
+
+@pytest.mark.parametrize('fast_path', (True, False))
+def test_feed_search_pages_by_cursor(settings, user_client, follows,
+                                     fast_path):
+    settings.RECIPE_FAST_PATH = fast_path
+    pages = get_pages(
+        user_client, '/api/recipes/feed/', {'limit': 4, 'search': 'рецепт'}
+    )
+    assert [
+        recipe['id'] for page in pages for recipe in page['results']
+    ] == list(follows.values_list('pk', flat=True))
+
+
+def test_feed_queries_fan_in_authors_at_once(user, authors, user_client,
+                                             follows,
+                                             django_assert_num_queries):
+    Follow.objects.create(user=user, author=authors[2])
+    authors[2].feed_fan_in = True
+    authors[2].save()
+    with django_assert_num_queries(2):
+        get_feed_positions(user, 5)
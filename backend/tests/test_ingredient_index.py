@@ -0,0 +1,18 @@
+import pytest
+
+from api.indexes import IngredientIndex
+from recipes.models import Ingredient
+
+pytestmark = pytest.mark.django_db
+
+
+def test_version_checked_once_per_ttl(settings, django_assert_num_queries):
+    settings.INGREDIENT_INDEX_TTL = 60
+    Ingredient.objects.create(name='сахар', measurement_unit='г')
+    index = IngredientIndex()
+    assert [item.name for item in index.search('сах')] == ['сахар']
+    Ingredient.objects.create(name='сахарная пудра', measurement_unit='г')
+    with django_assert_num_queries(0):
+        assert len(index.search('сах')) == 1
+    settings.INGREDIENT_INDEX_TTL = 0
+    assert len(index.search('сах')) == 2
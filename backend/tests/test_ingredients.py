@@ -0,0 +1,55 @@
+from importlib import import_module
+from types import SimpleNamespace
+
+import pytest
+from django.apps import apps
+from django.core.management import call_command
+from django.db import connection
+
+from recipes.models import (Ingredient, IngredientInRecipe, Recipe,
+                            ShoppingList)
+
+migration = import_module('recipes.migrations.0007_unique_ingredient')
+
+pytestmark = pytest.mark.django_db
+
+
+def test_migration_merges_unstripped_duplicates(user, authors):
+    salt = Ingredient.objects.create(name='соль', measurement_unit='г')
+    padded = Ingredient.objects.create(name=' соль ', measurement_unit='г ')
+    pepper = Ingredient.objects.create(name='перец ', measurement_unit='г')
+    recipe = Recipe.objects.create(
+        author=authors[0], name='Суп', text='Суп', cooking_time=1
+    )
+    recipe.ingredients.set([salt, padded])
+    IngredientInRecipe.objects.create(
+        recipe=recipe, ingredients=salt, amount=1
+    )
+    IngredientInRecipe.objects.create(
+        recipe=recipe, ingredients=padded, amount=2
+    )
+    ShoppingList.objects.create(user=user, ingredient=padded, amount=2)
+    migration.merge_duplicate_ingredients(
+        apps, SimpleNamespace(connection=connection)
+    )
+    assert set(Ingredient.objects.values_list('pk', 'name')) == {
+        (salt.pk, 'соль'), (pepper.pk, 'перец'),
+    }
+    assert list(recipe.ingredients.all()) == [salt]
+    assert list(
+        recipe.amount_ingredient.values_list('ingredients', 'amount')
+    ) == [(salt.pk, 3)]
+    assert list(
+        ShoppingList.objects.values_list('user', 'ingredient', 'amount')
+    ) == [(user.pk, salt.pk, 2)]
+
+
+def test_dry_run_counts_existing_ingredients(tmp_path, capsys):
+    Ingredient.objects.create(name='соль', measurement_unit='г')
+    path = tmp_path / 'ingredients.csv'
+    path.write_text('соль,г\nперец,г\nперец,г\n', encoding='utf-8')
+    call_command('script_data', path=str(path), dry_run=True)
+    assert (
+        'прочитано 2, добавлено 1, пропущено 1' in capsys.readouterr().out
+    )
+    assert Ingredient.objects.count() == 1
@@ -0,0 +1,43 @@
+import pytest
+
+from api.memberships import CART, FAVORITES, load_memberships
+from api.services import clear_cart
+from recipes.models import Cart, Favorite
+
+pytestmark = pytest.mark.django_db
+
+
+def test_orm_changes_invalidate_memberships(
+    user, recipes, django_capture_on_commit_callbacks
+):
+    assert recipes[1].pk not in load_memberships(user.pk)[FAVORITES]
+    with django_capture_on_commit_callbacks(execute=True):
+        Favorite.objects.create(user=user, recipe=recipes[1])
+    assert recipes[1].pk in load_memberships(user.pk)[FAVORITES]
+    with django_capture_on_commit_callbacks(execute=True):
+        Favorite.objects.filter(user=user, recipe=recipes[0]).delete()
+    assert recipes[0].pk not in load_memberships(user.pk)[FAVORITES]
+    with django_capture_on_commit_callbacks(execute=True):
+        recipes[3].delete()
+    assert recipes[3].pk not in load_memberships(user.pk)[CART]
+    with django_capture_on_commit_callbacks(execute=True):
+        clear_cart(user)
+    assert not load_memberships(user.pk)[CART]
+
+
+def test_api_changes_invalidate_memberships(
+    user, recipes, user_client, django_capture_on_commit_callbacks
+):
+    recipe = recipes[1]
+    assert recipe.pk not in load_memberships(user.pk)[CART]
+    with django_capture_on_commit_callbacks(execute=True):
+        response = user_client.post(f'/api/recipes/{recipe.pk}/shopping_cart/')
+    assert response.status_code == 201
+    assert recipe.pk in load_memberships(user.pk)[CART]
+    with django_capture_on_commit_callbacks(execute=True):
+        response = user_client.delete(
+            f'/api/recipes/{recipe.pk}/shopping_cart/'
+        )
+    assert response.status_code == 204
+    assert recipe.pk not in load_memberships(user.pk)[CART]
+    assert Cart.objects.filter(user=user).exists()
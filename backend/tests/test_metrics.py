@@ -0,0 +1,44 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from prometheus_client import REGISTRY
+
+LABELS = {
+    'view': 'RecipeViewSet',
+    'action': 'download_shopping_cart',
+    'method': 'GET',
+    'status': '200',
+}
+SAMPLES = (
+    'foodgram_request_seconds_count',
+    'foodgram_response_bytes_sum',
+    'foodgram_sql_queries_sum',
+)
+
+
+def get_samples():
+    return {
+        name: REGISTRY.get_sample_value(name, LABELS) or 0
+        for name in SAMPLES
+    }
+
+
+@pytest.mark.django_db
+def test_streaming_response_observed_after_body(user_client, recipes):
+    before = get_samples()
+    with CaptureQueriesContext(connection) as context:
+        response = user_client.get(
+            '/api/recipes/download_shopping_cart/', {'format': 'csv'}
+        )
+        assert get_samples() == before
+        body = b''.join(response.streaming_content)
+    after = get_samples()
+    assert after['foodgram_request_seconds_count'] == (
+        before['foodgram_request_seconds_count'] + 1
+    )
+    assert after['foodgram_response_bytes_sum'] == (
+        before['foodgram_response_bytes_sum'] + len(body)
+    )
+    assert after['foodgram_sql_queries_sum'] == (
+        before['foodgram_sql_queries_sum'] + len(context)
+    )
@@ -0,0 +1,31 @@
+import pytest
+
+LIST_QUERIES = {'anonymous_client': 5, 'user_client': 9}
+DETAIL_QUERIES = {'anonymous_client': 4, 'user_client': 8}
+
+pytestmark = [
+    pytest.mark.django_db,
+    pytest.mark.parametrize('fast_path', (True, False)),
+    pytest.mark.parametrize('client_name', tuple(LIST_QUERIES)),
+]
+
+
+@pytest.mark.parametrize('limit', (5, 25))
+def test_recipe_list_queries(request, settings, django_assert_num_queries,
+                             recipes, fast_path, client_name, limit):
+    settings.RECIPE_FAST_PATH = fast_path
+    client = request.getfixturevalue(client_name)
+    with django_assert_num_queries(LIST_QUERIES[client_name]):
+        response = client.get('/api/recipes/', {'limit': limit})
+    assert response.status_code == 200
+    assert len(response.json()['results']) == limit
+
+
+def test_recipe_detail_queries(request, settings, django_assert_num_queries,
+                               recipes, fast_path, client_name):
+    settings.RECIPE_FAST_PATH = fast_path
+    client = request.getfixturevalue(client_name)
+    with django_assert_num_queries(DETAIL_QUERIES[client_name]):
+        response = client.get(f'/api/recipes/{recipes[0].pk}/')
+    assert response.status_code == 200
+    assert response.json()['id'] == recipes[0].pk
@@ -0,0 +1,22 @@
+from django.core.cache.backends.db import DatabaseCache
+from rest_framework.authtoken.models import Token
+
+from api.routers import ReplicaRouter, start_routing, stop_routing
+
+from recipes.models import Recipe
+
+
+def test_only_replicated_writes_pin_primary(settings):
+    settings.DATABASE_REPLICAS = ['default']
+    router = ReplicaRouter()
+    state, token = start_routing()
+    try:
+        for model in (
+            DatabaseCache('cache_table', {}).cache_model_class, Token
+        ):
+            assert router.db_for_write(model) is None
+        assert not state.pinned and not state.written
+        assert router.db_for_write(Recipe) == 'default'
+        assert state.pinned and state.written
+    finally:
+        stop_routing(token)
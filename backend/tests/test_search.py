@@ -0,0 +1,31 @@
+import pytest
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.mark.parametrize('fast_path', (True, False))
+def test_search_ranks_matching_recipes(settings, anonymous_client, recipes,
+                                       fast_path):
+    settings.RECIPE_FAST_PATH = fast_path
+    recipes[7].name = 'Тыквенный суп'
+    recipes[7].save()
+    response = anonymous_client.get('/api/recipes/', {'search': 'тыкв'})
+    assert response.status_code == 200
+    assert [recipe['id'] for recipe in response.json()['results']] == [
+        recipes[7].pk
+    ]
+
+
+def test_search_matches_ingredients(anonymous_client, recipes):
+    response = anonymous_client.get(
+        '/api/recipes/', {'search': 'ингредиент', 'limit': 50}
+    )
+    assert response.json()['count'] == len(recipes)
+
+
+def test_search_rejects_cursor(anonymous_client, recipes):
+    response = anonymous_client.get(
+        '/api/recipes/', {'search': 'рецепт', 'cursor': ''}
+    )
+    assert response.status_code == 400
+    assert 'search' in response.json()
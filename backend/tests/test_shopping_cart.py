@@ -0,0 +1,26 @@
+import pytest
+
+URL = '/api/recipes/download_shopping_cart/'
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('params', ({}, {'format': 'csv'}))
+def test_download_errors_are_json(anonymous_client, params):
+    response = anonymous_client.get(URL, params)
+    assert response.status_code == 401
+    assert response['Content-Type'] == 'application/json'
+    assert 'detail' in response.json()
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('cart_format, content_type', (
+    ('txt', 'text/plain'),
+    ('csv', 'text/csv'),
+    ('pdf', 'application/pdf'),
+))
+def test_download_streams_cart(user_client, recipes, cart_format,
+                               content_type):
+    response = user_client.get(URL, {'format': cart_format})
+    assert response.status_code == 200
+    assert response['Content-Type'].startswith(content_type)
+    assert b''.join(response.streaming_content)
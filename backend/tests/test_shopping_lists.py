@@ -0,0 +1,83 @@
+import pytest
+
+from api.services import clear_cart, get_live_shopping_lists, remove_recipes
+from recipes.models import Cart, ShoppingList
+
+pytestmark = pytest.mark.django_db
+
+
+def assert_shopping_lists_match():
+    assert {
+        (user, ingredient): amount
+        for user, ingredient, amount in ShoppingList.objects.values_list(
+            'user', 'ingredient', 'amount'
+        )
+    } == get_live_shopping_lists()
+
+
+def test_fixture_fills_shopping_list(user, recipes):
+    assert ShoppingList.objects.filter(user=user).exists()
+    assert_shopping_lists_match()
+
+
+def test_api_cart_delete(user_client, recipes):
+    response = user_client.delete(
+        f'/api/recipes/{recipes[0].pk}/shopping_cart/'
+    )
+    assert response.status_code == 204
+    assert_shopping_lists_match()
+
+
+def test_batch_remove_and_clear(user, recipes):
+    remove_recipes(Cart, user, [recipes[0].pk, recipes[3].pk])
+    assert_shopping_lists_match()
+    clear_cart(user)
+    assert not ShoppingList.objects.filter(user=user).exists()
+
+
+def test_orm_cart_delete(user, recipes):
+    Cart.objects.filter(user=user, recipe=recipes[3]).delete()
+    assert_shopping_lists_match()
+
+
+def test_recipe_delete(recipes, authors):
+    recipes[0].delete()
+    assert_shopping_lists_match()
+    authors[0].delete()
+    assert_shopping_lists_match()
+
+
+def test_orm_cart_create(user, recipes):
+    Cart.objects.create(user=user, recipe=recipes[1])
+    assert_shopping_lists_match()
+
+
+def test_admin_recipe_ingredients_change(admin_client, recipes):
+    recipe = recipes[0]
+    amounts = list(recipe.amount_ingredient.order_by('pk'))
+    data = {
+        'name': recipe.name,
+        'author': recipe.author_id,
+        'text': recipe.text,
+        'cooking_time': recipe.cooking_time,
+        'tags': list(recipe.tags.values_list('pk', flat=True)),
+        'ingredients': [amount.ingredients_id for amount in amounts],
+        'amount_ingredient-TOTAL_FORMS': len(amounts),
+        'amount_ingredient-INITIAL_FORMS': len(amounts),
+        'amount_ingredient-MIN_NUM_FORMS': 0,
+        'amount_ingredient-MAX_NUM_FORMS': 1000,
+    }
+    for number, amount in enumerate(amounts):
+        data.update({
+            f'amount_ingredient-{number}-id': amount.pk,
+            f'amount_ingredient-{number}-recipe': recipe.pk,
+            f'amount_ingredient-{number}-ingredients': amount.ingredients_id,
+            f'amount_ingredient-{number}-amount': amount.amount * 3,
+            f'amount_ingredient-{number}-DELETE': 'on' if number else '',
+        })
+    response = admin_client.post(
+        f'/admin/recipes/recipe/{recipe.pk}/change/', data
+    )
+    assert response.status_code == 302
+    assert recipe.amount_ingredient.count() == 1
+    assert_shopping_lists_match()
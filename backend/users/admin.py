@@ -1,18 +1,25 @@
 from django.contrib import admin
 
 from .models import Follow, User
+from recipes.paginators import EstimatedCountPaginator
 
 
 @admin.register(User)
 class UserAdmin(admin.ModelAdmin):
     list_display = ('id', 'username', 'email', 'first_name', 'last_name')
     search_fields = ('username', 'email')
-    list_filter = ('email', 'first_name')
+    list_filter = ('is_staff', 'is_active', 'feed_fan_in')
     empty_value_display = '-пусто-'
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
 
 @admin.register(Follow)
 class FollowAdmin(admin.ModelAdmin):
     list_display = ('user', 'author')
-    search_fields = ('author', 'user')
-    list_filter = ('author',)
+    list_select_related = ('user', 'author')
+    search_fields = ('author__username', 'user__username')
+    autocomplete_fields = ('user', 'author')
+    empty_value_display = '-пусто-'
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
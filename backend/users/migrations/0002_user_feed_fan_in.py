@@ -0,0 +1,18 @@
+# Generated by Django 3.2.6 on 2026-10-18 15:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='feed_fan_in',
+            field=models.BooleanField(default=False, help_text='Рецепты автора не рассылаются в ленты подписчиков, а читаются из ленты напрямую', verbose_name='Лента без рассылки'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 3.2.6 on 2026-10-18 18:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_user_feed_fan_in'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='follow',
+            index=models.Index(fields=('author', 'user'), name='follow_author_user_idx'),
+        ),
+    ]
@@ -29,6 +29,14 @@ class User(AbstractUser):
         verbose_name='Фамилия пользователя',
         help_text='Введите фамилию пользователя'
     )
+    feed_fan_in = models.BooleanField(
+        default=False,
+        verbose_name='Лента без рассылки',
+        help_text=(
+            'Рецепты автора не рассылаются в ленты подписчиков, '
+            'а читаются из ленты напрямую'
+        )
+    )
 
     class Meta:
         verbose_name = 'Пользователь'
@@ -62,6 +70,12 @@ class Follow(models.Model):
                 name='follow_user_author_constraint'
             ),
         )
+        indexes = (
+            models.Index(
+                fields=('author', 'user'),
+                name='follow_author_user_idx'
+            ),
+        )
 
     def __str__(self):
         return (